@@ -1,13 +1,54 @@
+import bisect
+import html
+import os
 import streamlit as st
-from utils.db_manager import get_other_users_data, get_user_name, get_chat_history, get_user_id, add_message,get_job_role,get_language
+from utils.db_manager import get_other_users_data, get_user_name, get_chat_history, get_messages_since, get_user_id, add_message,get_job_role,get_language
+from utils.db_manager import get_user_teams, get_team_history, get_team_messages_since, add_team_message, mark_team_read, get_team_unread_counts, team_conversation_key
+from utils.db_manager import get_conversation_states, mark_dm_read, heartbeat, get_online_users
+from utils.db_manager import DEFAULT_PAGE_SIZE, start_translation_workers
 from streamlit_autorefresh import st_autorefresh  
+from utils.metrics import timed, start_metrics_server
+from utils.auth import authenticate, current_user
 
 # -------------------
 # Config & Variables
 # -------------------
-user_id = "user_3"
+# Signed-in user from the session token (checked in memory, no DB read per rerun).
+# For local development only, TEAMSYNC_DEFAULT_USER=<user_id> skips the login.
+user_id = current_user(st.session_state.get("auth_token")) or os.getenv("TEAMSYNC_DEFAULT_USER")
+if not user_id:
+    # Not signed in (or the session expired): sign in here, then rerun as that user
+    st.set_page_config(page_title="teamsync — Login", page_icon="🔐", layout="centered")
+    st.title("teamsync")
+    with st.form(key="login_form"):
+        login_id = st.text_input("User ID", placeholder="Enter your user id")
+        password = st.text_input("Password", type="password", placeholder="Enter your password")
+        if st.form_submit_button("Enter"):
+            token = authenticate(login_id, password) if login_id.strip() and password.strip() else None
+            if token:
+                st.session_state["auth_token"] = token
+                st.rerun()
+            st.error("Invalid User ID or Password.")
+    st.stop()
 user_name = get_user_name(user_id)
 language = get_language(user_id)
+# Messages shown at once; "Load older messages" widens the window a page at a time
+MESSAGE_WINDOW = 50
+
+# Shared classes for the message list, so each bubble carries only class names
+CHAT_CSS = """
+<style>
+.ts-chat { display:flex; flex-direction:column-reverse; max-height:70vh; overflow-y:auto; padding:0 4px; }
+.ts-row { display:flex; margin:5px 0; }
+.ts-row.mine { justify-content:flex-end; }
+.ts-row.theirs { justify-content:flex-start; }
+.ts-bubble { display:inline-block; padding:10px 14px; border-radius:12px; word-wrap:break-word;
+             white-space:pre-wrap; font-size:30px; color:black; max-width:70%; }
+.ts-bubble.mine { background:#d4f7d4; }
+.ts-bubble.theirs { background:#d4eaff; border:1px solid #ddd; }
+.ts-pending { font-style:italic; }
+</style>
+"""
 st.set_page_config(
     page_title=f"{user_name}'s TeamSync",
     page_icon=":speech_balloon:",
@@ -20,13 +61,47 @@ st.set_page_config(
 if "selected_chat" not in st.session_state:
     st.session_state["selected_chat"] = "HOME"
 
+# Per-peer cache of fetched messages and their rendered HTML, so a refresh
+# only asks the DB for messages written or updated since the last one we saw.
+if "chat_cache" not in st.session_state:
+    st.session_state["chat_cache"] = {}
+
 st_autorefresh(interval=20_000, key="refresh_chat")
+# Prometheus endpoint when METRICS_PORT is set (started once per process).
+# teamsync_render_seconds{phase} splits a rerun into sidebar / fetch / html / output;
+# Mongo and Ollama time is in teamsync_mongo_command_seconds and teamsync_llm_request_seconds.
+start_metrics_server()
+# Translation workers and the pending-translation requeue, once per process
+start_translation_workers()
 
 welcome_text = f"Hello, {user_name} !"
-user_list = get_other_users_data(user_id)
+with timed("teamsync_render", phase="sidebar"):
+    heartbeat(user_id)
+    user_list = get_other_users_data(user_id)
+    user_ids_by_name = {name: uid for uid, name in user_list.items()}
+    # Unread counts and last messages for every DM in one query, plus who is online
+    dm_states = get_conversation_states(user_id)
+    online = get_online_users()
+
+    # Team channels are listed after DMs as "# <team name>"
+    team_options = {f"# {team['team_name']}": team for team in get_user_teams(user_id)}
+    team_unread = get_team_unread_counts(user_id)
 
 main_list = ["HOME"]
 main_list.extend(user_list.values())
+main_list.extend(team_options)
+
+def format_chat_option(option):
+    team = team_options.get(option)
+    if team:
+        unread = team_unread.get(team["team_id"], 0)
+    elif option in user_ids_by_name:
+        peer_id = user_ids_by_name[option]
+        unread = dm_states.get(peer_id, {}).get("unread", 0)
+        option = f"{'🟢' if peer_id in online else '⚪'} {option}"
+    else:
+        unread = 0
+    return f"{option} ({unread})" if unread else option
 
 st.sidebar.title(welcome_text)
 st.sidebar.divider()
@@ -34,7 +109,8 @@ st.sidebar.divider()
 to = st.sidebar.selectbox(
     "Direct Messages:", 
     options=main_list, 
-    index=main_list.index(st.session_state["selected_chat"])
+    index=main_list.index(st.session_state["selected_chat"]) if st.session_state["selected_chat"] in main_list else 0,
+    format_func=format_chat_option,
 )
 
 st.session_state["selected_chat"] = to
@@ -51,10 +127,30 @@ if to == "HOME":
         unsafe_allow_html=True
     )
 
+    # Recent DMs from the conversation summaries already loaded for the sidebar
+    recent = sorted(
+        (state for state in dm_states.values() if state.get("last_message") and state["peer_user_id"] in user_list),
+        key=lambda state: state["last_message"]["ts"],
+        reverse=True,
+    )
+    for state in recent[:10]:
+        last = state["last_message"]
+        who = "You" if last["sender_user_id"] == user_id else user_list[state["peer_user_id"]]
+        unread = f" **({state['unread']} unread)**" if state.get("unread") else ""
+        st.markdown(f"**{html.escape(user_list[state['peer_user_id']])}**{unread}: {html.escape(who)}: {html.escape(last['preview'])}")
+
 # -------------------
 # Chat Page
 # -------------------
 else:
+    team = team_options.get(to)
+    if team:
+        to_id = None
+        header_detail = f"{len(team['participants'])} MEMBERS"
+    else:
+        to_id = get_user_id(to)
+        header_detail = get_job_role(to_id)
+
     # Header / About user section (fixed)
     st.markdown(
         f"""
@@ -73,9 +169,9 @@ else:
         ">
             <div style='display:flex; align-items:center; gap:15px;'>
                 <img src='https://cdn-icons-png.flaticon.com/512/149/149071.png' style='border-radius:50%; width:60px; height:60px;'/>
-                <h3 style='margin:0; color:white;'>{to}</h3>
+                <h3 style='margin:0; color:white;'>{html.escape(str(to))}</h3>
             </div>
-            <h2 style='margin:0; color:white;'>{get_job_role(get_user_id(to))}</h2>
+            <h2 style='margin:0; color:white;'>{html.escape(str(header_detail))}</h2>
         </div>
         """,
         unsafe_allow_html=True
@@ -84,42 +180,110 @@ else:
     # # Chat container with scrollable messages
     # st.markdown("<div style='height:500px; overflow-y:auto; padding:20px; margin:15px; border:1px solid #ddd; border-radius:12px; background-color:#ffffff;'>", unsafe_allow_html=True)
 
-    # Get chat history
-    to_id = get_user_id(to)
-    message_list = get_chat_history(user_id, to_id)
-    
-    for message in message_list:
+    def fetch_history(before=None, before_id=None):
+        if team:
+            return get_team_history(team["team_id"], before=before, before_id=before_id)
+        return get_chat_history(user_id, to_id, before=before, before_id=before_id)
+
+    def remember(chat, message):
+        """Cache the message's bubble HTML by message_id; rebuilt only when what it shows changes."""
+        if chat["hwm"] is None or message["updated_at"] > chat["hwm"]:
+            chat["hwm"] = message["updated_at"]
         content = message["content"].strip()
         if not content:
-            continue
-
-        # Determine if current user is sender
+            return None
         is_sender = message["sender_user_id"] == user_id
 
-        # Decide what text to display
-        if is_sender or get_language(user_id) == "english":
+        # Decide what text to display: the reader's language from the
+        # translations map, else the legacy single translation, else the original
+        if is_sender:
             display_text = content
         else:
-            display_text = message.get("translated", content)
+            display_text = message.get("translations", {}).get(language) or message.get("translated") or content
+        translating = not is_sender and (language in message.get("pending_languages", []) or (
+            "pending_languages" not in message and message.get("translation_status") == "pending"
+        ))
+
+        key = message["message_id"]
+        signature = (display_text, translating)
+        cached = chat["rendered"].get(key)
+        if cached is None or cached[0] != signature:
+            side = "mine" if is_sender else "theirs"
+            # In team channels, name the sender of other members' posts
+            sender = "" if is_sender or not team else f"<b>{html.escape(str(get_user_name(message['sender_user_id'])))}</b><br>"
+            # A raw blank line would end the markdown HTML block mid-window, so break lines with <br>
+            body = html.escape(display_text).replace("\n", "<br>")
+            pending = " <span class='ts-pending'>(translating…)</span>" if translating else ""
+            chat["rendered"][key] = (signature, (
+                f"<div class='ts-row {side}'><div class='ts-bubble {side}'>"
+                f"{sender}{body}{pending}</div></div>"
+            ))
+        return key if cached is None else None
+
+    # Get chat history (a page on first open, then only new or updated messages)
+    chat_key = team_conversation_key(team["team_id"]) if team else to_id
+    chat = st.session_state["chat_cache"].setdefault(
+        chat_key, {"order": [], "rendered": {}, "hwm": None, "window": MESSAGE_WINDOW, "has_more": True}
+    )
+    with timed("teamsync_render", phase="fetch"):
+        if chat["hwm"] is None:
+            new_messages = fetch_history()
+            chat["has_more"] = len(new_messages) == DEFAULT_PAGE_SIZE
+        elif team:
+            new_messages = get_team_messages_since(team["team_id"], chat["hwm"])
+        else:
+            new_messages = get_messages_since(user_id, to_id, chat["hwm"])
+
+    with timed("teamsync_render", phase="html"):
+        for message in new_messages:
+            # The sync overlap re-delivers messages we already hold; remember() only
+            # re-renders those whose text changed (a translation landing).
+            # Updates to messages older than anything loaded are not shown.
+            if chat["order"] and (message["ts"], message["_id"]) < chat["order"][0][1:] and message["message_id"] not in chat["rendered"]:
+                continue
+            key = remember(chat, message)
+            if key is not None:
+                # Usually the end; a message whose write landed late goes in at its own place
+                bisect.insort(chat["order"], (key, message["ts"], message["_id"]), key=lambda entry: entry[1:])
 
-        # Styling
-        bg_color = "#d4f7d4" if is_sender else "#d4eaff"
-        border_style = "" if is_sender else "border:1px solid #ddd;"
+    if len(chat["order"]) > chat["window"] or chat["has_more"]:
+        if st.button("Load older messages", key=f"older_{chat_key}"):
+            if len(chat["order"]) <= chat["window"]:
+                _, oldest_ts, oldest_id = chat["order"][0] if chat["order"] else (None, None, None)
+                older = fetch_history(before=oldest_ts, before_id=oldest_id)
+                chat["has_more"] = len(older) == DEFAULT_PAGE_SIZE
+                older_order = []
+                for message in older:
+                    key = remember(chat, message)
+                    if key is not None:
+                        older_order.append((key, message["ts"], message["_id"]))
+                chat["order"][:0] = older_order
+            chat["window"] += MESSAGE_WINDOW
 
-        # Use flexbox to align left/right
+    # One element for the whole visible window instead of one per message
+    with timed("teamsync_render", phase="output"):
+        visible = chat["order"][-chat["window"]:]
         st.markdown(
-            f"<div style='display:flex; justify-content:{'flex-end' if is_sender else 'flex-start'}; margin:5px 0;'>"
-            f"<div style='display:inline-block; padding:10px 14px; border-radius:12px; "
-            f"word-wrap:break-word; white-space:pre-wrap; font-size:30px; color:black; "
-            f"background:{bg_color}; {border_style}; max-width:70%;'>{display_text}</div>"
-            f"</div>",
-            unsafe_allow_html=True
+            CHAT_CSS + "<div class='ts-chat'><div>"
+            + "".join(chat["rendered"][key][1] for key, _, _ in visible)
+            + "</div></div>",
+            unsafe_allow_html=True,
         )
+
+    # Everything on screen is now read; only write the cursor when it moves
+    if team and chat["order"] and chat.get("read_ts") != chat["order"][-1][1]:
+        chat["read_ts"] = chat["order"][-1][1]
+        mark_team_read(user_id, team["team_id"], chat["read_ts"])
+    elif not team and dm_states.get(to_id, {}).get("unread"):
+        mark_dm_read(user_id, to_id)
     
     # Input field
-    input_msg = st.chat_input(f"Enter Message for {str(to).upper()} - ( {str(get_job_role(to_id)).upper()} )")
+    input_msg = st.chat_input(f"Enter Message for {str(to).upper()} - ( {str(header_detail).upper()} )")
     if input_msg:
-        add_message(user_id, to_id, input_msg)
+        if team:
+            add_team_message(user_id, team["team_id"], input_msg)
+        else:
+            add_message(user_id, to_id, input_msg)
         st.rerun()
 
     # st.markdown(
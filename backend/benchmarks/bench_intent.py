@@ -0,0 +1,80 @@
+"""Latency/throughput of the intent classifier on CPU: eager vs quantized TorchScript.
+
+Run from backend/ after training (and optionally intent-export.py):
+
+    python -m benchmarks.bench_intent --messages 512 --batch-sizes 1 8 32
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import torch
+
+from utils.intent_filter import load_intent_model, model_dir, MAX_LENGTH, TORCHSCRIPT_FILE
+from utils.task_identifier_model import few_shot_examples
+
+
+def load_corpus(size: int):
+    """Realistic chat lines (few-shot examples + sample messages), repeated up to `size`."""
+    sample_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils", "messages_sample.json")
+    with open(sample_path) as f:
+        lines = [m["content"] for m in json.load(f)]
+    lines += [ex["message"] for ex in few_shot_examples]
+    return [lines[i % len(lines)] for i in range(size)]
+
+
+def run(backend: str, messages, batch_size: int, padding):
+    tokenizer, forward, _, _ = load_intent_model(backend)
+    if padding == "max_length":
+        # The training script's fixed layout, as a baseline
+        encode = lambda batch: tokenizer(batch, truncation=True, padding="max_length", max_length=MAX_LENGTH, return_tensors="pt")
+        ordered = messages
+    else:
+        encode = lambda batch: tokenizer(batch, truncation=True, padding=True, max_length=MAX_LENGTH, return_tensors="pt")
+        ordered = sorted(messages, key=len)
+
+    latencies = []
+    with torch.inference_mode():
+        # Warm-up batch so one-off graph optimisation is not timed
+        warm = encode(ordered[:batch_size])
+        forward(warm["input_ids"], warm["attention_mask"])
+        started = time.perf_counter()
+        for start in range(0, len(ordered), batch_size):
+            t0 = time.perf_counter()
+            inputs = encode(ordered[start:start + batch_size])
+            forward(inputs["input_ids"], inputs["attention_mask"])
+            latencies.append((time.perf_counter() - t0) * 1000)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "msgs_per_s": len(ordered) / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=512)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (default: torch's choice)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    messages = load_corpus(args.messages)
+
+    configs = [("eager", "max_length"), ("eager", "dynamic")]
+    if os.path.exists(os.path.join(model_dir(), TORCHSCRIPT_FILE)):
+        configs.append(("torchscript", "dynamic"))
+    else:
+        print(f"⚠️ {TORCHSCRIPT_FILE} not found; run intent-export.py to include the int8 model.")
+
+    print(f"{'backend':<12} {'padding':<11} {'batch':>5} {'p50 ms':>9} {'p95 ms':>9} {'msgs/s':>10}")
+    for batch_size in args.batch_sizes:
+        for backend, padding in configs:
+            r = run(backend, messages, batch_size, padding)
+            print(f"{backend:<12} {padding:<11} {batch_size:>5} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['msgs_per_s']:>10.1f}")
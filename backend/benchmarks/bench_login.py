@@ -0,0 +1,114 @@
+"""Login throughput under concurrent sign-ins, and the cost of checking a session per page load.
+
+Users are seeded with salted hashes into a scratch database (mongomock by
+default), then each run signs them in from `--signers` threads. The page-load
+comparison validates the returned tokens in memory against the old per-rerun
+USERS lookup. Run from backend/:
+
+    python -m benchmarks.bench_login --signers 1 8 32 --logins 256
+    python -m benchmarks.bench_login --mongo-uri mongodb://localhost:27017 --iterations 600000
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+
+LOGIN_BENCH_DB = "TEAMSYNC-LOGINBENCH"
+
+
+def run_logins(authenticate, users: int, signers: int, total: int):
+    per_signer = total // signers
+    latencies = []
+    tokens = []
+    failures = [0]
+    lock = threading.Lock()
+    start_gate = threading.Barrier(signers + 1)
+
+    def signer(n):
+        local_latencies, local_tokens, local_failures = [], [], 0
+        start_gate.wait()
+        for i in range(per_signer):
+            user_id = f"bench_{(n * per_signer + i) % users}"
+            t0 = time.perf_counter()
+            token = authenticate(user_id, f"pw_{user_id}")
+            local_latencies.append((time.perf_counter() - t0) * 1000)
+            if token:
+                local_tokens.append(token)
+            else:
+                local_failures += 1
+        with lock:
+            latencies.extend(local_latencies)
+            tokens.extend(local_tokens)
+            failures[0] += local_failures
+
+    threads = [threading.Thread(target=signer, args=(n,)) for n in range(signers)]
+    for t in threads:
+        t.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return tokens, {
+        "logins_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "failures": failures[0],
+    }
+
+
+def time_per_call(fn, items):
+    t0 = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - t0) * 1e6 / max(1, len(items))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--signers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--logins", type=int, default=256, help="Logins per run, split across signers")
+    parser.add_argument("--iterations", type=int, help="PBKDF2 cost (default: AUTH_HASH_ITERATIONS)")
+    parser.add_argument("--mongo-uri", default="mongomock://", help="mongomock:// or a local mongod URI")
+    parser.add_argument("--db", default=LOGIN_BENCH_DB)
+    args = parser.parse_args()
+
+    if args.db == "TEAMSYNC-DB":
+        parser.error("refusing to benchmark against the application database")
+
+    # utils modules read their configuration at import, so set it up first
+    os.environ.update({"TEAMSYNC_MONGO_URI": args.mongo_uri, "TEAMSYNC_DB": args.db})
+    if args.iterations:
+        os.environ["AUTH_HASH_ITERATIONS"] = str(args.iterations)
+
+    from utils.mongo_client import get_client
+    from utils.bulk_import import import_collection, prepare_user
+    from utils.auth import HASH_ITERATIONS, authenticate, current_user, users_db
+
+    get_client().drop_database(args.db)
+    users_db.create_index("user_id", unique=True)
+    t0 = time.perf_counter()
+    import_collection(users_db, (
+        {"user_id": f"bench_{i}", "username": f"Bench User {i}", "password": f"pw_bench_{i}"}
+        for i in range(args.users)
+    ), "user_id", prepare=prepare_user)
+    print(f"🌱 Seeded {args.users} users at {HASH_ITERATIONS:,} PBKDF2 iterations in {time.perf_counter() - t0:.1f}s")
+
+    print(f"{'signers':>7} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'failed':>7}")
+    tokens = []
+    for signers in args.signers:
+        tokens, r = run_logins(authenticate, args.users, signers, args.logins)
+        print(f"{signers:>7} {r['logins_per_s']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['failures']:>7}")
+
+    # What every Streamlit rerun pays to know who is signed in
+    user_ids = [f"bench_{i % args.users}" for i in range(len(tokens))]
+    in_memory = time_per_call(current_user, tokens)
+    per_load_lookup = time_per_call(lambda user_id: users_db.find_one({"user_id": user_id}), user_ids)
+    print(f"Page-load session check: {in_memory:.1f} µs in memory vs {per_load_lookup:.1f} µs per USERS lookup")
+
+    get_client().drop_database(args.db)
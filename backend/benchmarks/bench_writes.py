@@ -0,0 +1,124 @@
+"""Sustained message sends/s under concurrent senders (team-channel burst pattern).
+
+Each send is the full write path: add_message (directory lookups, insert,
+translation submit, DM conversation-state upsert) or add_team_message. It
+runs against a scratch database (mongomock by default) with the indexes
+db_manager builds, and translations go to benchmarks.fake_ollama.
+Run from backend/:
+
+    python -m benchmarks.bench_writes --senders 1 8 32 --messages 5000
+    python -m benchmarks.bench_writes --target team --mongo-uri mongodb://localhost:27017
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from bson import ObjectId
+
+from benchmarks.fake_ollama import FakeOllama
+
+
+WRITE_BENCH_DB = "TEAMSYNC-WRITEBENCH"
+BENCH_TEAM_ID = 1
+LANGUAGES = ["english", "hindi", "gujarati"]
+
+
+def seed(db, users: int):
+    """Senders in mixed languages, so sends also queue translations, plus one team of all of them."""
+    db["USERS"].insert_many([
+        {"user_id": f"bench_{i}", "username": f"Bench User {i}", "role": ["tester"],
+         "primary_language": LANGUAGES[i % len(LANGUAGES)]}
+        for i in range(users)
+    ])
+    db["TEAMS"].insert_one({
+        "team_id": BENCH_TEAM_ID, "team_name": "Bench Team", "owner_user_id": "bench_0",
+        "participants": [f"bench_{i}" for i in range(users)],
+    })
+
+
+def run(dm, senders: int, total: int, target: str):
+    per_sender = total // senders
+    latencies = []
+    ids = []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(senders + 1)
+
+    def sender(n):
+        local_latencies, local_ids = [], []
+        sender_id, receiver_id = f"bench_{n}", f"bench_{n + 1}"
+        start_gate.wait()
+        for i in range(per_sender):
+            t0 = time.perf_counter()
+            if target == "team":
+                message_id = dm.add_team_message(sender_id, BENCH_TEAM_ID, f"burst message {i}")
+            else:
+                message_id = dm.add_message(sender_id, receiver_id, f"burst message {i}")
+            local_latencies.append((time.perf_counter() - t0) * 1000)
+            local_ids.append(message_id)
+        with lock:
+            latencies.extend(local_latencies)
+            ids.extend(local_ids)
+
+    threads = [threading.Thread(target=sender, args=(n,)) for n in range(senders)]
+    for t in threads:
+        t.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    # What the old per-second ids (msg_<unix seconds>) would have produced
+    old_ids = {int(ObjectId(message_id[len("msg_"):]).generation_time.timestamp()) for message_id in ids}
+    return {
+        "sends_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "duplicate_ids": len(ids) - len(set(ids)),
+        "old_id_collisions": len(ids) - len(old_ids),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--senders", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--messages", type=int, default=5000, help="Messages per run, split across senders")
+    parser.add_argument("--target", choices=["dm", "team"], default="dm",
+                        help="dm: add_message to the next sender; team: add_team_message to one channel")
+    parser.add_argument("--ollama-latency-ms", type=float, default=200.0)
+    parser.add_argument("--mongo-uri", default="mongomock://", help="mongomock:// or a local mongod URI")
+    parser.add_argument("--db", default=WRITE_BENCH_DB)
+    args = parser.parse_args()
+
+    if args.db == "TEAMSYNC-DB":
+        parser.error("refusing to benchmark against the application database")
+
+    fake = FakeOllama(latency_ms=args.ollama_latency_ms).start()
+    # utils modules read their configuration at import, so set it up first
+    os.environ.update({
+        "TEAMSYNC_MONGO_URI": args.mongo_uri,
+        "TEAMSYNC_DB": args.db,
+        "OLLAMA_HOST": fake.url,
+        "TRANSLATION_CACHE_PATH": os.path.join(tempfile.mkdtemp(prefix="teamsync-writes-"), "translation_cache.db"),
+    })
+
+    from utils.mongo_client import get_client
+    from utils import db_manager as dm
+
+    print(f"{'senders':>7} {'sends/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'dup ids':>8} {'old-id dups':>12}")
+    for senders in args.senders:
+        # Fresh data each run, with the same indexes as the application collections
+        get_client().drop_database(args.db)
+        dm.ensure_indexes()
+        seed(dm.main_db, senders + 1)
+        dm.user_directory.reload()
+        r = run(dm, senders, args.messages, args.target)
+        print(f"{senders:>7} {r['sends_per_s']:>9.0f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['duplicate_ids']:>8} {r['old_id_collisions']:>12}")
+
+    get_client().drop_database(args.db)
+    fake.stop()
@@ -0,0 +1,152 @@
+"""Stand-in for the Ollama HTTP API with configurable latency, for benchmarks.
+
+Serves /api/generate (task detection), /api/chat (LangChain's ChatOllama:
+translation and the HR bot) and /api/embed, streaming or not. Point the app
+at it with OLLAMA_HOST (ChatOllama) and OLLAMA_API_URL (task detection):
+
+    python -m benchmarks.fake_ollama --port 11500 --latency-ms 300 --token-ms 20
+"""
+import argparse
+import json
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllama:
+    """Threaded HTTP server; every request waits `latency_ms`, then each streamed chunk `token_ms`."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, token_ms: float = 0.0,
+                 tokens: int = 8, embedding_size: int = 64):
+        self.latency_ms = latency_ms
+        self.token_ms = token_ms
+        self.tokens = tokens
+        self.embedding_size = embedding_size
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _count(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def reply_text(self, path: str, body: dict) -> str:
+        """Deterministic reply; translation requests echo the text so outputs stay distinguishable."""
+        if path == "/api/generate":
+            return "No task found."
+        messages = body.get("messages") or [{}]
+        text = str(messages[-1].get("content", ""))
+        return " ".join(["[translated]"] + text.split()[-self.tokens:])
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                fake._count(self.path)
+                if self.path == "/api/tags":
+                    self._send_json({"models": []})
+                else:
+                    self._send_json({})
+
+            def do_POST(self):
+                fake._count(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                time.sleep(fake.latency_ms / 1000)
+
+                if self.path in ("/api/embed", "/api/embeddings"):
+                    inputs = body.get("input", body.get("prompt", ""))
+                    inputs = inputs if isinstance(inputs, list) else [inputs]
+                    vectors = [[((zlib.crc32(str(text).encode()) >> i) % 97) / 97 for i in range(fake.embedding_size)] for text in inputs]
+                    self._send_json({"model": body.get("model"), "embeddings": vectors, "embedding": vectors[0]})
+                    return
+
+                words = fake.reply_text(self.path, body).split(" ")
+                created_at = datetime.now(timezone.utc).isoformat()
+                final = {
+                    "model": body.get("model"),
+                    "created_at": created_at,
+                    "done": True,
+                    "done_reason": "stop",
+                    "prompt_eval_count": len(str(body.get("prompt", body.get("messages", ""))).split()),
+                    "eval_count": len(words),
+                }
+
+                def chunk(text):
+                    if self.path == "/api/chat":
+                        return {"message": {"role": "assistant", "content": text}}
+                    return {"response": text}
+
+                if not body.get("stream", True):
+                    self._send_json({**final, **chunk(" ".join(words))})
+                    return
+
+                # Ollama streams newline-delimited JSON
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, word in enumerate(words):
+                    time.sleep(fake.token_ms / 1000)
+                    line = {"model": body.get("model"), "created_at": created_at, "done": False,
+                            **chunk(word if i == 0 else " " + word)}
+                    self._write_chunk(line)
+                self._write_chunk({**final, **chunk("")})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, payload):
+                data = json.dumps(payload).encode() + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--token-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    fake = FakeOllama(args.host, args.port, args.latency_ms, args.token_ms).start()
+    print(f"🧪 Fake Ollama listening on {fake.url}")
+    print(f"   OLLAMA_HOST={fake.url} OLLAMA_API_URL={fake.url}/api/generate")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,305 @@
+"""Load test of the chat flows against a local MongoDB (or mongomock) and a fake Ollama.
+
+Simulated users make the same db_manager calls a render of backend/app.py
+makes: log in, list users (sidebar), open a DM, then send and refresh. Each
+step reports p50/p95/p99 latency and the Mongo round trips it issued; the
+LLM side (background translation, translate_text, detect_task) runs
+against benchmarks.fake_ollama with the configured latency.
+
+Run from backend/:
+
+    python -m benchmarks.load_test --users 20 --rounds 10 --ollama-latency-ms 300
+    python -m benchmarks.load_test --mongo-uri mongodb://localhost:27017   # local mongod
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from pymongo import monitoring
+
+from benchmarks.fake_ollama import FakeOllama
+
+
+LANGUAGES = ["english", "hindi", "gujarati", "french", "spanish"]
+LOAD_TEST_DB = "TEAMSYNC-LOADTEST"
+MONGOMOCK_OPERATIONS = (
+    "find", "find_one", "insert_one", "insert_many", "update_one", "update_many", "aggregate",
+    "bulk_write", "find_one_and_update", "count_documents", "delete_one", "delete_many",
+)
+# Set when the backend could not run get_team_unread_counts, so the report can say so
+team_unread_skipped = threading.Event()
+
+
+# --------------------------------------
+# Round-trip counting
+# --------------------------------------
+class RoundTrips(monitoring.CommandListener):
+    """Mongo commands issued by the calling thread, so background workers are not counted."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def count(self) -> int:
+        return getattr(self._local, "count", 0)
+
+    def bump(self):
+        self._local.count = self.count() + 1
+
+    def started(self, event):
+        self.bump()
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def count_mongomock_calls(self):
+        """mongomock emits no command events; count outermost collection calls instead."""
+        import mongomock
+
+        local = self._local
+        for name in MONGOMOCK_OPERATIONS:
+            original = getattr(mongomock.Collection, name)
+
+            def counted(collection, *args, _original=original, **kwargs):
+                depth = getattr(local, "depth", 0)
+                if depth == 0:
+                    self.bump()
+                local.depth = depth + 1
+                try:
+                    return _original(collection, *args, **kwargs)
+                finally:
+                    local.depth = depth
+
+            setattr(mongomock.Collection, name, counted)
+
+
+class Recorder:
+    def __init__(self, round_trips: RoundTrips):
+        self.round_trips = round_trips
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def measure(self, step: str, fn, *args, **kwargs):
+        before = self.round_trips.count()
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self.samples.setdefault(step, []).append((elapsed_ms, self.round_trips.count() - before))
+        return result
+
+    def report(self):
+        print(f"{'step':<18} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'round trips':>12}")
+        for step, samples in self.samples.items():
+            latencies = sorted(ms for ms, _ in samples)
+            trips = statistics.mean(n for _, n in samples)
+            print(f"{step:<18} {len(samples):>6} {percentile(latencies, 50):>9.2f} {percentile(latencies, 95):>9.2f} "
+                  f"{percentile(latencies, 99):>9.2f} {trips:>12.1f}")
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))]
+
+
+# --------------------------------------
+# Seed data
+# --------------------------------------
+def seed(db, users: int, history: int):
+    """Synthetic users in mixed languages, one team of everyone, and `history` messages per DM pair."""
+    from utils.bulk_import import import_collection, prepare_message, prepare_user
+
+    user_docs = [
+        {
+            "user_id": f"load_{i}",
+            "username": f"Load User {i}",
+            "password": f"load_{i}",
+            "role": ["tester"],
+            "primary_language": LANGUAGES[i % len(LANGUAGES)],
+        }
+        for i in range(users)
+    ]
+    import_collection(db["USERS"], user_docs, "user_id", batch_size=1000, prepare=prepare_user)
+    import_collection(db["TEAMS"], [{
+        "team_id": 1,
+        "team_name": "Load Test Team",
+        "owner_user_id": "load_0",
+        "participants": [doc["user_id"] for doc in user_docs],
+    }], "team_id")
+
+    start = datetime.utcnow() - timedelta(minutes=history * users)
+
+    def messages():
+        for i in range(users):
+            peer = (i + 1) % users
+            for j in range(history):
+                ts = start + timedelta(minutes=i * history + j)
+                sender, receiver = (i, peer) if j % 2 == 0 else (peer, i)
+                yield prepare_message({
+                    "message_id": f"load_{i}_{j}",
+                    "sender_user_id": f"load_{sender}",
+                    "receiver_user_id": f"load_{receiver}",
+                    "team_id": 0,
+                    "content": f"Seeded message {j} between load_{i} and load_{peer}",
+                    "translated": "",
+                    "translations": {},
+                    "translation_status": "not_needed",
+                    "task_status": "pending",
+                    "date": ts.strftime("%Y-%m-%d"),
+                    "time": ts.strftime("%H:%M:%S"),
+                    "ts": ts,
+                })
+
+    import_collection(db["MESSAGES"], messages(), "message_id", batch_size=1000)
+
+
+# --------------------------------------
+# Simulated user (mirrors backend/app.py and pages_folder/login.py)
+# --------------------------------------
+def simulate_user(recorder: Recorder, user_index: int, rounds: int, think_ms: float, seed_value: int):
+    from utils import db_manager as dm
+    from utils.auth import authenticate, current_user
+
+    rng = random.Random(seed_value + user_index)
+    user_id = f"load_{user_index}"
+    team_unread = [True]
+
+    def login():
+        return authenticate(user_id, user_id)
+
+    def render_sidebar():
+        current_user(token)
+        dm.get_user_name(user_id)
+        dm.get_language(user_id)
+        dm.heartbeat(user_id)
+        names = dm.get_other_users_data(user_id)
+        dm.get_conversation_states(user_id)
+        dm.get_online_users()
+        dm.get_user_teams(user_id)
+        if team_unread[0]:
+            try:
+                dm.get_team_unread_counts(user_id)
+            except NotImplementedError:
+                # mongomock cannot run $lookup with let; skipped there and flagged in the report
+                team_unread[0] = False
+                team_unread_skipped.set()
+        return names
+
+    def open_dm(peer_name):
+        render_sidebar()
+        peer_id = dm.get_user_id(peer_name)
+        dm.get_job_role(peer_id)
+        history = dm.get_chat_history(user_id, peer_id)
+        dm.mark_dm_read(user_id, peer_id)
+        return peer_id, history
+
+    def refresh(peer_id, hwm):
+        render_sidebar()
+        dm.get_job_role(peer_id)
+        return dm.get_messages_since(user_id, peer_id, hwm)
+
+    token = recorder.measure("login", login)
+    names = recorder.measure("list_users", render_sidebar)
+    peer_name = rng.choice(list(names.values()))
+    peer_id, history = recorder.measure("open_dm", open_dm, peer_name)
+    hwm = max((m["updated_at"] for m in history), default=datetime.utcnow() - timedelta(days=1))
+
+    for i in range(rounds):
+        time.sleep(think_ms / 1000)
+        recorder.measure("send", dm.add_message, user_id, peer_id, f"Load test message {i} from {user_id}")
+        for message in recorder.measure("refresh", refresh, peer_id, hwm):
+            hwm = max(hwm, message["updated_at"])
+
+
+def measure_llm(recorder: Recorder, calls: int):
+    from utils.translate_func import translate_text
+    from utils.task_identifier_model import detect_task
+
+    for i in range(calls):
+        # Unique text so the translation cache does not answer
+        recorder.measure("translate_text", translate_text, f"Please review the draft {i} {time.time_ns()}", "english", "hindi")
+        recorder.measure("detect_task", detect_task, f"Schedule review number {i} for tomorrow")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="Concurrent simulated users")
+    parser.add_argument("--rounds", type=int, default=10, help="Send + refresh cycles per user")
+    parser.add_argument("--history", type=int, default=200, help="Seeded messages per DM pair")
+    parser.add_argument("--think-ms", type=float, default=0.0)
+    parser.add_argument("--llm-calls", type=int, default=10, help="Direct translate_text/detect_task calls")
+    parser.add_argument("--ollama-latency-ms", type=float, default=200.0)
+    parser.add_argument("--ollama-token-ms", type=float, default=5.0)
+    parser.add_argument("--mongo-uri", default="mongomock://", help="mongomock:// or a local mongod URI")
+    parser.add_argument("--db", default=LOAD_TEST_DB)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--hash-iterations", type=int, help="PBKDF2 cost for seeded users (default: AUTH_HASH_ITERATIONS)")
+    args = parser.parse_args()
+
+    if args.db == "TEAMSYNC-DB":
+        parser.error("refusing to load test the application database")
+
+    fake = FakeOllama(latency_ms=args.ollama_latency_ms, token_ms=args.ollama_token_ms).start()
+    # utils modules read their configuration at import, so set it up first
+    os.environ.update({
+        "TEAMSYNC_MONGO_URI": args.mongo_uri,
+        "TEAMSYNC_DB": args.db,
+        "OLLAMA_HOST": fake.url,
+        "OLLAMA_API_URL": f"{fake.url}/api/generate",
+        "TRANSLATION_CACHE_PATH": os.path.join(tempfile.mkdtemp(prefix="teamsync-load-"), "translation_cache.db"),
+    })
+    if args.hash_iterations:
+        os.environ["AUTH_HASH_ITERATIONS"] = str(args.hash_iterations)
+    round_trips = RoundTrips()
+    if args.mongo_uri.startswith("mongomock://"):
+        round_trips.count_mongomock_calls()
+    else:
+        monitoring.register(round_trips)
+
+    from utils.mongo_client import get_client, get_database
+
+    get_client().drop_database(args.db)
+    db = get_database()
+    t0 = time.perf_counter()
+    seed(db, args.users, args.history)
+    print(f"🌱 Seeded {args.users} users, {args.users * args.history:,} messages in {time.perf_counter() - t0:.1f}s")
+
+    from utils import db_manager
+
+    recorder = Recorder(round_trips)
+    threads = [
+        threading.Thread(target=simulate_user, args=(recorder, i, args.rounds, args.think_ms, args.seed))
+        for i in range(args.users)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    # Translations of the sent messages land in the background
+    drain_started = time.perf_counter()
+    translation_pool = db_manager.get_translation_pool()
+    while translation_pool.queue_depth() or translation_pool.in_flight:
+        time.sleep(0.05)
+    drain = time.perf_counter() - drain_started
+
+    measure_llm(recorder, args.llm_calls)
+
+    print(f"👥 {args.users} users x {args.rounds} rounds in {elapsed:.1f}s; translation backlog drained in {drain:.1f}s")
+    recorder.report()
+    if team_unread_skipped.is_set():
+        print("⚠️ get_team_unread_counts is not supported by mongomock and was left out of list_users, "
+              "open_dm and refresh; run with --mongo-uri against a local mongod to include it")
+    print("Translation workers:", translation_pool.stats())
+    print("Fake Ollama requests:", fake.requests)
+
+    get_client().drop_database(args.db)
+    fake.stop()
@@ -0,0 +1,68 @@
+import os
+import torch
+from utils.intent_filter import load_eager_model, model_dir as current_model_dir, TORCHSCRIPT_FILE
+
+# ============================================================
+# 1️⃣ Paths (same layout as intent-identifier-peft.py)
+# ============================================================
+
+# ./intent_adapter if a LoRA adapter was trained, else ./intent_model
+# (INTENT_ADAPTER_DIR / INTENT_MODEL_DIR override); run from backend/
+model_dir = current_model_dir()
+export_path = os.path.join(model_dir, TORCHSCRIPT_FILE)
+
+# Servers are CPU-only; export and run there
+torch.set_num_threads(max(1, os.cpu_count() or 1))
+print(f"🧠 Exporting from: {model_dir}")
+
+# ============================================================
+# 2️⃣ Load the fine-tuned model behind a logits-only wrapper
+# ============================================================
+
+class LogitsOnly(torch.nn.Module):
+    """(input_ids, attention_mask) -> logits; tracing needs plain tensors in and out."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
+# An adapter is merged into its base model first, so the export is self-contained
+tokenizer, base_model, _ = load_eager_model()
+model = LogitsOnly(base_model)
+model.eval()
+
+# ============================================================
+# 3️⃣ Dynamic int8 quantization of the Linear layers
+# ============================================================
+
+quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+# ============================================================
+# 4️⃣ Trace with a dynamically padded batch
+# ============================================================
+
+# Batch size and sequence length stay dynamic in the traced graph, so the
+# inference side can pad each batch only to its own longest message.
+example = tokenizer(
+    ["Schedule a meeting with the design team tomorrow.", "ok"],
+    padding=True,
+    return_tensors="pt",
+)
+with torch.inference_mode():
+    traced = torch.jit.trace(quantized, (example["input_ids"], example["attention_mask"]), strict=False)
+    traced = torch.jit.freeze(traced)
+
+    # Sanity check against the eager model on a different shape
+    check = tokenizer(["Remind me to call Sarah.", "Hey, how's it going?", "No tasks today."],
+                      padding=True, return_tensors="pt")
+    eager_pred = model(check["input_ids"], check["attention_mask"]).argmax(-1)
+    traced_pred = traced(check["input_ids"], check["attention_mask"]).argmax(-1)
+    print(f"🔎 Eager vs int8 predictions agree: {bool((eager_pred == traced_pred).all())}")
+
+torch.jit.save(traced, export_path)
+size_mb = os.path.getsize(export_path) / 1e6
+print(f"✅ Quantized TorchScript model saved to: {export_path} ({size_mb:.1f} MB)")
+print("utils/intent_filter.py picks it up automatically (INTENT_BACKEND=auto).")
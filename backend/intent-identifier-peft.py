@@ -1,3 +1,5 @@
+import argparse
+import hashlib
 import torch
 import pandas as pd
 from datasets import Dataset
@@ -5,27 +7,48 @@ from sklearn.preprocessing import LabelEncoder
 from transformers import (
     AutoTokenizer,
     AutoModelForSequenceClassification,
+    DataCollatorWithPadding,
+    EarlyStoppingCallback,
     TrainingArguments,
     Trainer,
 )
+from transformers.trainer_utils import get_last_checkpoint
+from peft import LoraConfig, TaskType, get_peft_model
 import evaluate
 import numpy as np
 import joblib
 import os
 
+# ============================================================
+# 0️⃣ Run options
+# ============================================================
+
+parser = argparse.ArgumentParser(description="Train the chat intent classifier.")
+parser.add_argument("--mode", choices=["lora", "full"], default="lora",
+                    help="lora: train small adapters on a frozen base (default); full: fine-tune every weight.")
+parser.add_argument("--data", default="intent_dataset.csv")
+parser.add_argument("--base-model", default="distilbert-base-uncased")
+parser.add_argument("--epochs", type=int, default=20)
+parser.add_argument("--patience", type=int, default=3, help="Stop after this many epochs without eval F1 improving.")
+parser.add_argument("--lora-r", type=int, default=8)
+parser.add_argument("--lora-alpha", type=int, default=16)
+parser.add_argument("--resume", action="store_true",
+                    help="Continue an interrupted run on the same data, mode and base model from its last checkpoint.")
+args = parser.parse_args()
+
 # ============================================================
 # 1️⃣ Check for GPU
 # ============================================================
 
 device = "cuda" if torch.cuda.is_available() else "cpu"
-print(f"🧠 Using device: {device.upper()}")
+print(f"🧠 Using device: {device.upper()} | mode: {args.mode.upper()}")
 
 # ============================================================
 # 2️⃣ Load and prepare your dataset
 # ============================================================
 
 # Change the path to your dataset file
-df = pd.read_csv("intent_dataset.csv")
+df = pd.read_csv(args.data)
 
 # Encode labels (e.g., event, reminder, no_event)
 le = LabelEncoder()
@@ -39,20 +62,39 @@ dataset = dataset.train_test_split(test_size=0.2, seed=42)
 # 3️⃣ Tokenization
 # ============================================================
 
-model_name = "distilbert-base-uncased"
+model_name = args.base_model
 tokenizer = AutoTokenizer.from_pretrained(model_name)
 
 def preprocess_function(examples):
-    return tokenizer(examples["message"], truncation=True, padding="max_length", max_length=64)
+    # No padding here: the data collator pads each batch to its longest message
+    return tokenizer(examples["message"], truncation=True, max_length=64)
 
-tokenized_datasets = dataset.map(preprocess_function, batched=True)
+tokenized_datasets = dataset.map(preprocess_function, batched=True, remove_columns=["message"])
+data_collator = DataCollatorWithPadding(tokenizer=tokenizer)
 
 # ============================================================
 # 4️⃣ Load Model (on GPU if available)
 # ============================================================
 
 num_labels = len(le.classes_)
-model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=num_labels).to(device)
+model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=num_labels)
+
+if args.mode == "lora":
+    # Only low-rank adapters on the attention projections (and the new
+    # classification head) are trained; the DistilBERT base stays frozen.
+    lora_config = LoraConfig(
+        task_type=TaskType.SEQ_CLS,
+        r=args.lora_r,
+        lora_alpha=args.lora_alpha,
+        lora_dropout=0.1,
+        target_modules=["q_lin", "v_lin"],
+        # DistilBERT's head is two freshly initialised layers; both must be trained and saved
+        modules_to_save=["pre_classifier", "classifier"],
+    )
+    model = get_peft_model(model, lora_config)
+    model.print_trainable_parameters()
+
+model = model.to(device)
 
 # ============================================================
 # 5️⃣ Define Metrics
@@ -72,19 +114,30 @@ def compute_metrics(eval_pred):
 # 6️⃣ Training Configuration
 # ============================================================
 
+# One checkpoint directory per dataset and setup, so retraining on new labels never picks up an older run
+with open(args.data, "rb") as f:
+    run_id = hashlib.sha256(f.read() + f"{args.base_model}|{args.lora_r}|{args.lora_alpha}".encode()).hexdigest()[:12]
+output_dir = f"./intent_model_results_{args.mode}_{run_id}"
 training_args = TrainingArguments(
-    output_dir="./intent_model_results",
-    learning_rate=2e-5,
+    output_dir=output_dir,
+    # Adapters need a much larger step size than a full fine-tune
+    learning_rate=5e-4 if args.mode == "lora" else 2e-5,
     per_device_train_batch_size=16,
     per_device_eval_batch_size=16,
-    num_train_epochs=20,
+    num_train_epochs=args.epochs,
     weight_decay=0.01,
+    eval_strategy="epoch",
+    save_strategy="epoch",
+    save_total_limit=2,
+    load_best_model_at_end=True,
+    metric_for_best_model="f1",
+    greater_is_better=True,
     logging_dir="./logs",
     push_to_hub=False,
 )
 
 # ============================================================
-# 7️⃣ Train the Model
+# 7️⃣ Train the Model (with --resume, from the last checkpoint of this run)
 # ============================================================
 
 trainer = Trainer(
@@ -92,11 +145,15 @@ trainer = Trainer(
     args=training_args,
     train_dataset=tokenized_datasets["train"],
     eval_dataset=tokenized_datasets["test"],
-    tokenizer=tokenizer,
+    data_collator=data_collator,
     compute_metrics=compute_metrics,
+    callbacks=[EarlyStoppingCallback(early_stopping_patience=args.patience)],
 )
 
-trainer.train()
+last_checkpoint = get_last_checkpoint(output_dir) if args.resume and os.path.isdir(output_dir) else None
+if last_checkpoint:
+    print(f"↩️ Resuming from checkpoint: {last_checkpoint}")
+trainer.train(resume_from_checkpoint=last_checkpoint)
 
 # ============================================================
 # 8️⃣ Evaluate and Save
@@ -105,20 +162,22 @@ trainer.train()
 metrics = trainer.evaluate()
 print(f"✅ Evaluation Results: {metrics}")
 
-# Create directory for saving
-save_dir = "./intent_model"
+# LoRA saves only the adapter weights, next to but separate from the base model
+save_dir = "./intent_adapter" if args.mode == "lora" else "./intent_model"
 os.makedirs(save_dir, exist_ok=True)
 
-# Save model, tokenizer, and label encoder
+# Save model (or adapter), tokenizer, and label encoder
 trainer.save_model(save_dir)
 tokenizer.save_pretrained(save_dir)
 joblib.dump(le, os.path.join(save_dir, "label_encoder.pkl"))
 
 print(f"✅ Model, tokenizer, and label encoder saved in: {save_dir}")
-print("Files include: pytorch_model.bin, config.json, tokenizer.json, vocab.txt, label_encoder.pkl")
+if args.mode == "lora":
+    print("Files include: adapter_model.safetensors, adapter_config.json, tokenizer.json, vocab.txt, label_encoder.pkl")
+else:
+    print("Files include: model.safetensors, config.json, tokenizer.json, vocab.txt, label_encoder.pkl")
 
 # ============================================================
 # 9️⃣ Quick Inference Test
 # ============================================================
 
-# 
\ No newline at end of file
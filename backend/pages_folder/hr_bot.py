@@ -0,0 +1,27 @@
+# Streamlit HR bot page: answers questions from the documents knowledge base
+# and renders the answer token by token as it is generated.
+
+import streamlit as st
+from utils.knowledge_base import stream_answer, list_sources
+
+st.set_page_config(page_title="teamsync — HR Bot", page_icon="🧑‍💼", layout="centered")
+
+if "hr_bot_history" not in st.session_state:
+    st.session_state["hr_bot_history"] = []
+
+st.title("HR Bot")
+
+source = st.sidebar.selectbox("Answer from:", options=["All documents"] + list_sources())
+
+for role, text in st.session_state["hr_bot_history"]:
+    with st.chat_message(role):
+        st.write(text)
+
+question = st.chat_input("Ask about leave, projects, policies...")
+if question:
+    with st.chat_message("user"):
+        st.write(question)
+    with st.chat_message("assistant"):
+        answer = st.write_stream(stream_answer(question, source=None if source == "All documents" else source))
+    st.session_state["hr_bot_history"].append(("user", question))
+    st.session_state["hr_bot_history"].append(("assistant", answer))
@@ -2,26 +2,7 @@
 # Streamlit login page for project: teamsync with DB authentication
 
 import streamlit as st
-from pymongo import MongoClient
-import hashlib
-from utils.creds import URL
-# -----------------------
-# MongoDB CONNECTION
-# -----------------------
-database_name = "TEAMSYNC"
-collection_users = "USERS"
-collection_messages = "MESSAGES"
-try:
-        client = MongoClient(URL)
-        client.admin.command('ping')
-        print("Connection to MongoDB successful.")
-        
-except Exception as e:
-        print(f"Failed to connect to MongoDB: {e}")
-
-main_db = client[database_name]
-users_db = main_db[collection_users]
-messages_db = main_db[collection_messages]
+from utils.auth import authenticate
 
 # -----------------------
 # Streamlit Config
@@ -79,11 +60,11 @@ with st.form(key="login_form"):
         if not user_id.strip() or not password.strip():
             st.warning("Both User ID and Password are required — please fill in both fields.")
         else:
-            print(users_db)
-            user = users_db.find_one({"user_id": user_id, "password_hash": password})
+            # Salted-hash check; the token is validated in memory on later page loads
+            token = authenticate(user_id, password)
             
-            if user:
-                st.session_state["user_id"] = user_id
+            if token:
+                st.session_state["auth_token"] = token
                 st.success(f"Welcome {user_id}, redirecting to dashboard...")
 
             else:
@@ -0,0 +1,224 @@
+import argparse
+import base64
+import functools
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+
+from pymongo import UpdateOne
+
+from .mongo_client import get_database
+from .metrics import timed, register_collector
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------
+# Configuration (override with environment variables)
+# --------------------------------------
+HASH_ALGORITHM = "pbkdf2_sha256"
+# PBKDF2-SHA256 work factor; raising it upgrades stored hashes on next login
+HASH_ITERATIONS = int(os.getenv("AUTH_HASH_ITERATIONS", "600000"))
+SESSION_TTL_SECONDS = int(os.getenv("AUTH_SESSION_TTL", "43200"))
+MAX_SESSIONS = int(os.getenv("AUTH_MAX_SESSIONS", "100000"))
+SALT_BYTES = 16
+
+users_db = get_database()["USERS"]
+
+
+# --------------------------------------
+# Password hashing
+# --------------------------------------
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def hash_password(password: str, iterations: int = None) -> str:
+    """Salted PBKDF2 hash, stored as `pbkdf2_sha256$<iterations>$<salt>$<hash>`."""
+    iterations = iterations or HASH_ITERATIONS
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"{HASH_ALGORITHM}${iterations}${_b64(salt)}${_b64(digest)}"
+
+
+def is_hashed(stored) -> bool:
+    return isinstance(stored, str) and stored.startswith(HASH_ALGORITHM + "$")
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Constant-time check of `password` against a hash from hash_password."""
+    try:
+        _, iterations, salt, digest = stored.split("$")
+        expected = base64.b64decode(digest)
+        actual = hashlib.pbkdf2_hmac("sha256", password.encode(), base64.b64decode(salt), int(iterations))
+    except (ValueError, AttributeError):
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def needs_rehash(stored: str) -> bool:
+    return not is_hashed(stored) or int(stored.split("$")[1]) < HASH_ITERATIONS
+
+
+@functools.lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    """Unknown user ids are checked against this, so they cost the same as a wrong password."""
+    return hash_password(secrets.token_urlsafe(16))
+
+
+# --------------------------------------
+# Server-side sessions
+# --------------------------------------
+class SessionStore:
+    """Opaque session tokens held in process memory, so a page load needs no Mongo round trip.
+
+    Tokens expire `ttl_seconds` after their last use. Streamlit serves every
+    session from one process, so one store covers the whole app.
+    """
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS, max_sessions: int = MAX_SESSIONS):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self.created = 0
+        self.validated = 0
+        self.rejected = 0
+
+    def create(self, user_id: str) -> str:
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                self._purge(now)
+            if len(self._sessions) >= self.max_sessions:
+                # Still full of live sessions: drop the one closest to expiry
+                oldest = min(self._sessions, key=lambda t: self._sessions[t][1])
+                del self._sessions[oldest]
+            self._sessions[token] = (user_id, now + self.ttl_seconds)
+            self.created += 1
+        return token
+
+    def validate(self, token: str):
+        """The user id the token belongs to, or None if it is unknown or expired."""
+        if not token:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None or session[1] < now:
+                self._sessions.pop(token, None)
+                self.rejected += 1
+                return None
+            self._sessions[token] = (session[0], now + self.ttl_seconds)
+            self.validated += 1
+            return session[0]
+
+    def revoke(self, token: str):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def _purge(self, now: float):
+        expired = [token for token, (_, expires) in self._sessions.items() if expires < now]
+        for token in expired:
+            del self._sessions[token]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "created": self.created,
+                "validated": self.validated,
+                "rejected": self.rejected,
+            }
+
+
+sessions = SessionStore()
+register_collector("auth_sessions", sessions.stats)
+
+
+# --------------------------------------
+# Login
+# --------------------------------------
+@timed("teamsync_auth_login")
+def authenticate(user_id: str, password: str):
+    """Check the credentials and return a new session token, or None.
+
+    Users still stored with a plaintext `password` (or a plaintext
+    `password_hash`) are upgraded to a salted hash on their first login,
+    as are hashes below the current HASH_ITERATIONS.
+    """
+    user = users_db.find_one({"user_id": user_id}, {"password_hash": 1, "password": 1})
+    stored = (user or {}).get("password_hash") or (user or {}).get("password")
+    if user is None or stored is None:
+        verify_password(password, _dummy_hash())
+        return None
+
+    if is_hashed(stored):
+        ok = verify_password(password, stored)
+    else:
+        ok = hmac.compare_digest(str(stored).encode(), password.encode())
+    if not ok:
+        return None
+
+    if needs_rehash(stored) or "password" in user:
+        users_db.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"password_hash": hash_password(password)}, "$unset": {"password": ""}},
+        )
+    return sessions.create(user_id)
+
+
+def current_user(token: str):
+    """User id for a session token, checked in memory."""
+    return sessions.validate(token)
+
+
+def logout(token: str):
+    sessions.revoke(token)
+
+
+def migrate_plaintext_passwords(batch_size: int = 500):
+    """Hash every stored plaintext password now instead of at each user's next login."""
+    updates = []
+    migrated = 0
+    for user in users_db.find(
+        {"$or": [{"password": {"$exists": True}}, {"password_hash": {"$not": {"$regex": f"^{HASH_ALGORITHM}\\$"}}}]},
+        {"password_hash": 1, "password": 1},
+    ):
+        stored = user.get("password_hash")
+        if not is_hashed(stored):
+            # Same precedence as authenticate(): password_hash, then password
+            plaintext = stored if stored is not None else user.get("password")
+            if plaintext is None:
+                continue
+            stored = hash_password(str(plaintext))
+        updates.append(UpdateOne({"_id": user["_id"]}, {"$set": {"password_hash": stored}, "$unset": {"password": ""}}))
+        if len(updates) >= batch_size:
+            migrated += users_db.bulk_write(updates, ordered=False).modified_count
+            updates = []
+    if updates:
+        migrated += users_db.bulk_write(updates, ordered=False).modified_count
+    return migrated
+
+
+try:
+    users_db.create_index("user_id", unique=True)
+except Exception as e:
+    logger.error("USERS.user_id unique index not created: %s", e)
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m utils.auth --migrate
+    parser = argparse.ArgumentParser(description="TeamSync credential maintenance.")
+    parser.add_argument("--migrate", action="store_true", help="Hash all plaintext passwords in USERS.")
+    args = parser.parse_args()
+
+    if args.migrate:
+        print(f"✅ Hashed {migrate_plaintext_passwords()} plaintext passwords")
+    else:
+        parser.print_help()
@@ -0,0 +1,219 @@
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure, BulkWriteError
+
+from .mongo_client import get_database
+from .auth import hash_password, is_hashed
+
+logger = logging.getLogger(__name__)
+
+
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_FILES = {
+    "USERS": os.path.join(UTILS_DIR, "users_sample.json"),
+    "TEAMS": os.path.join(UTILS_DIR, "teams.json"),
+    "MESSAGES": os.path.join(UTILS_DIR, "messages_sample.json"),
+}
+# Natural key each collection is deduplicated on
+COLLECTION_KEYS = {"USERS": "user_id", "TEAMS": "team_id", "MESSAGES": "message_id"}
+READ_CHUNK = 1 << 16
+
+
+# --------------------------------------
+# Streaming readers
+# --------------------------------------
+def iter_json_array(path: str):
+    """Yield the objects of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buffer = ""
+        started = False
+        eof = False
+        while True:
+            stripped = buffer.lstrip()
+            if not started:
+                if stripped:
+                    if stripped[0] != "[":
+                        raise ValueError(f"{path}: expected a JSON array")
+                    buffer = stripped[1:]
+                    started = True
+                    continue
+            elif stripped.startswith(","):
+                buffer = stripped[1:]
+                continue
+            elif stripped.startswith("]"):
+                return
+            elif stripped:
+                try:
+                    obj, end = decoder.raw_decode(stripped)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield obj
+                    buffer = stripped[end:]
+                    continue
+            if eof:
+                if started:
+                    raise ValueError(f"{path}: unterminated JSON array")
+                return
+            chunk = f.read(READ_CHUNK)
+            eof = not chunk
+            buffer = stripped + chunk
+
+
+def iter_jsonl(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_records(path: str):
+    """Records from a .jsonl dump (one object per line) or a .json array."""
+    if path.endswith((".jsonl", ".ndjson")):
+        return iter_jsonl(path)
+    return iter_json_array(path)
+
+
+# --------------------------------------
+# Per-collection shaping
+# --------------------------------------
+def prepare_message(doc: dict) -> dict:
+    """Add the fields the app queries on, so imported history needs no backfill.
+
+    conversation_key matches db_manager.conversation_key, or
+    db_manager.team_conversation_key for team posts (no receiver).
+    """
+    if "ts" not in doc and doc.get("date") and doc.get("time"):
+        doc["ts"] = datetime.strptime(doc["date"] + " " + doc["time"], "%Y-%m-%d %H:%M:%S")
+    elif isinstance(doc.get("ts"), str):
+        doc["ts"] = datetime.fromisoformat(doc["ts"].replace("Z", "+00:00"))
+    doc.setdefault("updated_at", doc.get("ts"))
+    if doc.get("receiver_user_id"):
+        doc.setdefault("conversation_key", ":".join(sorted([doc["sender_user_id"], doc["receiver_user_id"]])))
+    else:
+        doc.setdefault("conversation_key", f"team:{doc['team_id']}")
+    doc["message_id"] = str(doc["message_id"])
+    return doc
+
+
+def prepare_user(doc: dict) -> dict:
+    """Store a salted hash instead of a plaintext `password` (cost: AUTH_HASH_ITERATIONS)."""
+    plaintext = doc.pop("password", None)
+    stored = doc.get("password_hash")
+    if stored is not None and not is_hashed(stored):
+        # Older exports kept the plaintext in password_hash
+        plaintext = stored
+    if plaintext is not None and not is_hashed(stored):
+        doc["password_hash"] = hash_password(str(plaintext))
+    return doc
+
+
+PREPARE = {"USERS": prepare_user, "MESSAGES": prepare_message}
+
+
+# --------------------------------------
+# Import
+# --------------------------------------
+def ensure_key_index(collection, key: str):
+    """Unique index on the natural key; plain index if existing data has duplicates."""
+    try:
+        collection.create_index(key, unique=True)
+    except OperationFailure as e:
+        logger.warning("%s.%s has duplicates, using a non-unique index: %s", collection.name, key, e)
+        collection.create_index(key)
+
+
+def import_collection(collection, records, key: str, batch_size: int = 1000, prepare=None, progress=None):
+    """Upsert records by `key` in unordered batches; re-running an import is a no-op.
+
+    Existing documents are left untouched: keys already in the collection
+    are looked up once per batch and skipped before `prepare` runs (so a
+    re-import does not re-hash passwords), and the rest are written with
+    $setOnInsert. `progress`, if given, is called with the stats after each batch.
+    """
+    ensure_key_index(collection, key)
+    stats = {"read": 0, "inserted": 0, "existing": 0, "errors": 0}
+    started = time.monotonic()
+    batch = []
+
+    def flush():
+        present = {doc[key] for doc in collection.find({key: {"$in": [doc[key] for doc in batch]}}, {key: 1})}
+        stats["existing"] += sum(1 for doc in batch if doc[key] in present)
+        writes = [
+            UpdateOne({key: doc[key]}, {"$setOnInsert": doc}, upsert=True)
+            for doc in (prepare(doc) if prepare is not None else doc for doc in batch if doc[key] not in present)
+        ]
+        batch.clear()
+        if not writes:
+            return
+        try:
+            result = collection.bulk_write(writes, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            stats["errors"] += len(details.get("writeErrors", []))
+        stats["inserted"] += details.get("nUpserted", 0)
+        stats["existing"] += details.get("nMatched", 0)
+
+    for doc in records:
+        batch.append(doc)
+        stats["read"] += 1
+        if len(batch) >= batch_size:
+            flush()
+            if progress is not None:
+                progress(dict(stats, seconds=time.monotonic() - started))
+    if batch:
+        flush()
+
+    stats["seconds"] = time.monotonic() - started
+    stats["docs_per_second"] = stats["read"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def import_file(collection_name: str, path: str, batch_size: int = 1000, db=None, progress=None):
+    db = db if db is not None else get_database()
+    return import_collection(
+        db[collection_name],
+        iter_records(path),
+        COLLECTION_KEYS[collection_name],
+        batch_size=batch_size,
+        prepare=PREPARE.get(collection_name),
+        progress=progress,
+    )
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m utils.bulk_import --samples
+    #                    python -m utils.bulk_import --messages dump.jsonl --batch-size 5000
+    parser = argparse.ArgumentParser(description="Bulk load users, teams and messages from JSON/JSONL files.")
+    parser.add_argument("--users", help="JSON array or JSONL file of users")
+    parser.add_argument("--teams", help="JSON array or JSONL file of teams")
+    parser.add_argument("--messages", help="JSON array or JSONL file of messages")
+    parser.add_argument("--samples", action="store_true", help="Load the sample files in backend/utils")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    files = dict(SAMPLE_FILES) if args.samples else {}
+    for name, path in (("USERS", args.users), ("TEAMS", args.teams), ("MESSAGES", args.messages)):
+        if path:
+            files[name] = path
+    if not files:
+        parser.error("nothing to import; pass --samples or a file")
+
+    def show_progress(name):
+        return lambda s: print(f"  {name}: {s['read']:,} docs ({s['read'] / s['seconds']:,.0f} docs/s)")
+
+    for name, path in files.items():
+        print(f"📥 Importing {path} into {name}")
+        stats = import_file(name, path, args.batch_size, progress=show_progress(name))
+        print(f"✅ {name}: {stats['inserted']:,} inserted, {stats['existing']:,} already present, "
+              f"{stats['errors']:,} errors, {stats['docs_per_second']:,.0f} docs/s")
@@ -1,37 +1,53 @@
-from pymongo import MongoClient
-from datetime import datetime
+import argparse
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import ConnectionFailure
+from bson import ObjectId
+from datetime import datetime, timedelta
+import logging
 import os
-from .creds import URL
-import certifi
-from .translate_func import translate_text
+import threading
+from .mongo_client import get_database
+from .translate_func import translate_text, translate_batch
+from .user_directory import UserDirectory
+from .translation_worker import TranslationWorkerPool
+from .metrics import register_collector
+
+logger = logging.getLogger(__name__)
 
 
-mongo_uri = URL
-database_name = "TEAMSYNC-DB"
 collection_users = "USERS"
 collection_messages = "MESSAGES"
+collection_teams = "TEAMS"
+collection_read_cursors = "READ_CURSORS"
+collection_conversations = "CONVERSATIONS"
+collection_presence = "PRESENCE"
 
-try:
-    client = MongoClient(mongo_uri,
-       tls=True,
-    tlsCAFile=certifi.where()
-    )
-    client.admin.command("ping")
-    print("✅ Connected to MongoDB")
-except Exception as e:
-    print(f"❌ MongoDB connection failed: {e}")
-
-main_db = client[database_name]
+main_db = get_database()
 users_db = main_db[collection_users]
 messages_db = main_db[collection_messages]
 users_col = users_db
 messages_col = messages_db
+teams_db = main_db[collection_teams]
+read_cursors_db = main_db[collection_read_cursors]
+conversations_db = main_db[collection_conversations]
+presence_db = main_db[collection_presence]
+
+user_directory = UserDirectory(users_db)
+register_collector("user_directory", user_directory.stats)
+
+DEFAULT_PAGE_SIZE = 50
+# Writers stamp updated_at from their own clocks before the write lands, so a
+# delta sync re-reads this far behind its high-water mark to catch late commits
+SYNC_OVERLAP = timedelta(seconds=int(os.getenv("SYNC_OVERLAP_SECONDS", "5")))
+# A user counts as online for this long after their last heartbeat
+PRESENCE_TTL_SECONDS = int(os.getenv("PRESENCE_TTL_SECONDS", "60"))
+PREVIEW_CHARS = 80
 
 # --------------------------------------
 def get_other_users_data(user_id):
     """Fetch list of all users"""
     final = {}
-    for doc in users_db.find():
+    for doc in user_directory.all():
         uid = doc["user_id"]
         name = doc["username"]
         if uid != user_id:    
@@ -39,82 +55,533 @@ def get_other_users_data(user_id):
     return final
 
 def get_user_name(user_id):
-    for doc in users_db.find():
-        uid = doc["user_id"]
-        name = doc["username"]
-        if uid == user_id:    
-            return name  
+    doc = user_directory.get(user_id)
+    if doc is not None:
+        return doc["username"]
 
 def get_user_id(user_name):
-    for doc in users_db.find():
-        uid = doc["user_id"]
-        name = doc["username"]
-        if name == user_name:    
-            return uid  
+    doc = user_directory.get_by_name(user_name)
+    if doc is not None:
+        return doc["user_id"]
 
 def get_job_role(user_id):
-    for doc in users_db.find():
-        uid = doc["user_id"]
+    doc = user_directory.get(user_id)
+    if doc is not None:
         roles = doc["role"]
-        if uid == user_id:    
-            roles = str(roles)
-            roles = roles.replace("[","")
-            roles = roles.replace("]","")
-            roles = roles.replace("'","")
-            roles = roles.replace('"',"")
-            roles = roles.replace(","," |")
-            roles = str(roles).strip()
-            roles = roles.upper()
-            return roles
-
-
-def get_chat_history(user1_id: str, user2_id: str):
-    """Fetch chat history between two users"""
-    chats = messages_db.find(
-        {
-            "$or": [
-                {"sender_user_id": user1_id, "receiver_user_id": user2_id},
-                {"sender_user_id": user2_id, "receiver_user_id": user1_id},
-            ]
-        },
-        {"_id": 0}
-    )
-    sorted_data = sorted(
-    chats.to_list(),
-    key=lambda x: datetime.strptime(x['date'] + ' ' + x['time'], "%Y-%m-%d %H:%M:%S")
-    )
+        roles = str(roles)
+        roles = roles.replace("[","")
+        roles = roles.replace("]","")
+        roles = roles.replace("'","")
+        roles = roles.replace('"',"")
+        roles = roles.replace(","," |")
+        roles = str(roles).strip()
+        roles = roles.upper()
+        return roles
+
+
+def conversation_key(user1_id: str, user2_id: str) -> str:
+    """Order-independent key shared by both directions of a DM."""
+    return ":".join(sorted([user1_id, user2_id]))
 
-    return list(sorted_data)
+
+# Newest first, with _id breaking ties between messages stored in the same millisecond
+HISTORY_SORT = [("ts", DESCENDING), ("_id", DESCENDING)]
+
+
+def _page(query: dict, before: datetime, before_id, limit: int):
+    if before is not None and before_id is not None:
+        query["$or"] = [{"ts": {"$lt": before}}, {"ts": before, "_id": {"$lt": before_id}}]
+    elif before is not None:
+        query["ts"] = {"$lt": before}
+    return list(messages_db.find(query).sort(HISTORY_SORT).limit(limit))[::-1]
+
+
+def get_chat_history(user1_id: str, user2_id: str, before: datetime = None, limit: int = DEFAULT_PAGE_SIZE,
+                     before_id=None):
+    """Fetch the newest page of chat history between two users.
+
+    Messages come back oldest first. To page further back, pass the `ts` and
+    `_id` of the first message of the previous page as `before` and
+    `before_id`; without `before_id`, messages sharing that `ts` are skipped.
+    """
+    return _page({"conversation_key": conversation_key(user1_id, user2_id)}, before, before_id, limit)
+
+def get_messages_since(user1_id: str, user2_id: str, since: datetime):
+    """Fetch only the messages written or updated after `since`, the caller's high-water mark.
+
+    Besides new messages this returns ones whose translation has landed since
+    the last call; callers match them to what they already hold by `message_id`.
+    The window starts SYNC_OVERLAP before `since`, so messages already seen
+    come back again and must be de-duplicated. Messages come back in
+    `updated_at` order, so the last one's `updated_at` is the next high-water mark.
+    """
+    chats = messages_db.find(
+        {"conversation_key": conversation_key(user1_id, user2_id), "updated_at": {"$gt": since - SYNC_OVERLAP}},
+    ).sort("updated_at", ASCENDING)
+    return list(chats)
 
 def get_language(user_id):
-    for doc in users_db.find():
-        uid = doc["user_id"]
-        lang = doc["primary_language"]
-        if uid == user_id:    
-            return lang
-        
-def add_message(sender_id: str, receiver_id: str, content: str, team_id: int = 0):
-    # Check if sender & receiver languages are the same
-    if get_language(receiver_id) != get_language(sender_id):
-    
-        translated_content = translate_text(content, get_language(sender_id), get_language(receiver_id))
-    else:
-        translated_content = ""
-    # Prepare message dictionary
-    message = {
-        "message_id": f"msg_{int(datetime.utcnow().timestamp())}",  # unique msg id
+    doc = user_directory.get(user_id)
+    if doc is not None:
+        return doc["primary_language"]
+
+
+def new_message_id() -> str:
+    """Unique, roughly time-ordered message id (ObjectId: timestamp + random + counter)."""
+    return f"msg_{ObjectId()}"
+
+
+def _build_message(sender_id: str, receiver_id: str, content: str, team_id: int, now: datetime, languages=()):
+    return {
+        "message_id": new_message_id(),
         "sender_user_id": sender_id,
         "receiver_user_id": receiver_id,
+        # No receiver means a team channel post
+        "conversation_key": conversation_key(sender_id, receiver_id) if receiver_id else team_conversation_key(team_id),
         "team_id": team_id,
         "content": str(content).strip(),
-        "translated": str(translated_content).strip(),
-        "date": datetime.utcnow().strftime("%Y-%m-%d"),
-        "time": datetime.utcnow().strftime("%H:%M:%S"),
+        "translated": "",
+        # Filled in by the translation workers, one entry per reader language
+        "translations": {},
+        "pending_languages": list(languages),
+        "translation_status": "pending" if languages else "not_needed",
+        "task_status": "pending",
+        "date": now.strftime("%Y-%m-%d"),
+        "time": now.strftime("%H:%M:%S"),
+        "ts": now,
+        "updated_at": now,
     }
 
-    # Insert into MongoDB
-    messages_db.insert_one(message)
-    
+
+def target_languages(sender_id: str, reader_ids):
+    """(sender language, sorted distinct reader languages that differ from it)."""
+    sender_lang = get_language(sender_id)
+    languages = {get_language(reader_id) for reader_id in reader_ids if reader_id != sender_id}
+    return sender_lang, sorted(lang for lang in languages if lang and lang != sender_lang)
+
+
+def _insert_and_translate(message: dict, sender_lang: str):
+    result = messages_db.insert_one(message)
+    # Translation happens in the background, one job per language
+    for target_lang in message["pending_languages"]:
+        get_translation_pool().submit(result.inserted_id, message["content"], sender_lang, target_lang)
+    return message["message_id"]
+
+
+def add_message(sender_id: str, receiver_id: str, content: str, team_id: int = 0):
+    sender_lang, targets = target_languages(sender_id, [receiver_id])
+    message = _build_message(sender_id, receiver_id, content, team_id, datetime.utcnow(), targets)
+    message_id = _insert_and_translate(message, sender_lang)
+    record_dm(message)
+    return message_id
+
+
+# --------------------------------------
+# Conversation state and presence
+# --------------------------------------
+# One CONVERSATIONS doc per (user, DM): unread counter and last-message
+# summary, kept up to date as messages are sent and read, so the sidebar
+# never has to look at message histories.
+def _summary(message: dict) -> dict:
+    return {
+        "message_id": message["message_id"],
+        "sender_user_id": message["sender_user_id"],
+        "preview": message["content"][:PREVIEW_CHARS],
+        "ts": message["ts"],
+    }
+
+
+def record_dm(message: dict):
+    """Bump the receiver's unread counter and both sides' last-message summary."""
+    sender_id, receiver_id = message["sender_user_id"], message["receiver_user_id"]
+    summary = _summary(message)
+    key = message["conversation_key"]
+    conversations_db.bulk_write([
+        UpdateOne(
+            {"user_id": receiver_id, "conversation_key": key},
+            {"$inc": {"unread": 1}, "$set": {"peer_user_id": sender_id, "last_message": summary}},
+            upsert=True,
+        ),
+        UpdateOne(
+            {"user_id": sender_id, "conversation_key": key},
+            {"$set": {"peer_user_id": receiver_id, "last_message": summary}, "$setOnInsert": {"unread": 0}},
+            upsert=True,
+        ),
+    ], ordered=False)
+
+
+def mark_dm_read(user_id: str, peer_id: str):
+    """Read acknowledgement: the user has seen everything in the DM with `peer_id`."""
+    conversations_db.update_one(
+        {"user_id": user_id, "conversation_key": conversation_key(user_id, peer_id), "unread": {"$gt": 0}},
+        {"$set": {"unread": 0, "read_at": datetime.utcnow()}},
+    )
+
+
+def get_conversation_states(user_id: str):
+    """{peer_user_id: {"unread", "last_message"}} for every DM of the user, in one query."""
+    return {
+        doc["peer_user_id"]: doc
+        for doc in conversations_db.find({"user_id": user_id}, {"_id": 0, "peer_user_id": 1, "unread": 1, "last_message": 1})
+    }
+
+
+_last_heartbeat = {}
+
+
+def heartbeat(user_id: str):
+    """Mark the user online; writes at most every third of PRESENCE_TTL_SECONDS per process."""
+    now = datetime.utcnow()
+    last = _last_heartbeat.get(user_id)
+    if last is not None and now - last < timedelta(seconds=PRESENCE_TTL_SECONDS / 3):
+        return
+    _last_heartbeat[user_id] = now
+    presence_db.update_one({"user_id": user_id}, {"$set": {"last_seen": now}}, upsert=True)
+
+
+def get_online_users():
+    """user_ids with a heartbeat inside the presence window.
+
+    The TTL index removes stale entries, but only once a minute, so the
+    window is also applied here.
+    """
+    since = datetime.utcnow() - timedelta(seconds=PRESENCE_TTL_SECONDS)
+    return {doc["user_id"] for doc in presence_db.find({"last_seen": {"$gte": since}}, {"_id": 0, "user_id": 1})}
+
+
+def backfill_conversation_states():
+    """Seed last-message summaries for DMs written before CONVERSATIONS existed.
+
+    Unread counts start at zero; existing state docs are left alone.
+    """
+    updates = []
+    for doc in messages_db.aggregate([
+        {"$match": {"receiver_user_id": {"$type": "string"}, "ts": {"$type": "date"}, "conversation_key": {"$type": "string"}}},
+        {"$sort": {"ts": DESCENDING}},
+        {"$group": {"_id": "$conversation_key", "last": {"$first": "$$ROOT"}}},
+    ], allowDiskUse=True):
+        message = doc["last"]
+        summary = _summary(message)
+        pair = (message["sender_user_id"], message["receiver_user_id"])
+        for user_id, peer_id in (pair, pair[::-1]):
+            updates.append(UpdateOne(
+                {"user_id": user_id, "conversation_key": doc["_id"]},
+                {"$setOnInsert": {"peer_user_id": peer_id, "unread": 0, "last_message": summary}},
+                upsert=True,
+            ))
+    if updates:
+        conversations_db.bulk_write(updates, ordered=False)
+    return len(updates) // 2
+
+
+# --------------------------------------
+# Team channels
+# --------------------------------------
+# A team post is stored once, with no receiver; members read it from the
+# channel and keep their own read cursor, so a post costs one write however
+# large the team is.
+EPOCH = datetime(1970, 1, 1)
+
+
+def team_conversation_key(team_id: int) -> str:
+    return f"team:{team_id}"
+
+
+def get_user_teams(user_id: str):
+    """Teams the user participates in, by team_id."""
+    return list(teams_db.find({"participants": user_id}, {"_id": 0}).sort("team_id", ASCENDING))
+
+
+def add_team_message(sender_id: str, team_id: int, content: str):
+    """Post once to the channel, translated once per distinct member language."""
+    team = teams_db.find_one({"team_id": team_id}, {"participants": 1}) or {}
+    sender_lang, targets = target_languages(sender_id, team.get("participants", []))
+    message = _build_message(sender_id, None, content, team_id, datetime.utcnow(), targets)
+    return _insert_and_translate(message, sender_lang)
+
+
+def get_team_history(team_id: int, before: datetime = None, limit: int = DEFAULT_PAGE_SIZE, before_id=None):
+    """Newest page of a team channel, oldest first; page back like get_chat_history."""
+    query = {"team_id": team_id, "conversation_key": team_conversation_key(team_id)}
+    return _page(query, before, before_id, limit)
+
+
+def get_team_messages_since(team_id: int, since: datetime):
+    """Team counterpart of get_messages_since."""
+    chats = messages_db.find(
+        {"conversation_key": team_conversation_key(team_id), "updated_at": {"$gt": since - SYNC_OVERLAP}},
+    ).sort("updated_at", ASCENDING)
+    return list(chats)
+
+
+def mark_team_read(user_id: str, team_id: int, read_until: datetime = None):
+    """Move the user's read cursor for a team forward (never backwards)."""
+    read_until = read_until or datetime.utcnow()
+    read_cursors_db.update_one(
+        {"user_id": user_id, "conversation_key": team_conversation_key(team_id)},
+        {"$max": {"last_read_ts": read_until}},
+        upsert=True,
+    )
+
+
+def get_team_unread_counts(user_id: str):
+    """{team_id: unread count} for every team of the user, counted in the database.
+
+    Unread means posted by someone else after the user's read cursor.
+    """
+    pipeline = [
+        {"$match": {"participants": user_id}},
+        {"$lookup": {
+            "from": collection_read_cursors,
+            "let": {"key": {"$concat": ["team:", {"$toString": "$team_id"}]}},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$user_id", user_id]},
+                    {"$eq": ["$conversation_key", "$$key"]},
+                ]}}},
+                {"$project": {"_id": 0, "last_read_ts": 1}},
+            ],
+            "as": "cursor",
+        }},
+        {"$project": {
+            "team_id": 1,
+            "key": {"$concat": ["team:", {"$toString": "$team_id"}]},
+            "last_read_ts": {"$ifNull": [{"$arrayElemAt": ["$cursor.last_read_ts", 0]}, EPOCH]},
+        }},
+        {"$lookup": {
+            "from": collection_messages,
+            "let": {"key": "$key", "last_read_ts": "$last_read_ts"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$conversation_key", "$$key"]},
+                    {"$gt": ["$ts", "$$last_read_ts"]},
+                    {"$ne": ["$sender_user_id", user_id]},
+                ]}}},
+                {"$count": "n"},
+            ],
+            "as": "unread",
+        }},
+        {"$project": {"_id": 0, "team_id": 1, "unread": {"$ifNull": [{"$arrayElemAt": ["$unread.n", 0]}, 0]}}},
+    ]
+    return {doc["team_id"]: doc["unread"] for doc in teams_db.aggregate(pipeline)}
+
+
+def backfill_message_timestamps(batch_size: int = 1000):
+    """Add `ts`, `updated_at` and `conversation_key` to messages stored before they existed."""
+    updates = []
+    updated = 0
+    for doc in messages_db.find(
+        {"$or": [
+            {"ts": {"$exists": False}},
+            {"updated_at": {"$exists": False}},
+            {"conversation_key": {"$exists": False}},
+        ]},
+        {"sender_user_id": 1, "receiver_user_id": 1, "team_id": 1, "date": 1, "time": 1, "ts": 1},
+    ):
+        try:
+            ts = doc.get("ts") or datetime.strptime(doc["date"] + " " + doc["time"], "%Y-%m-%d %H:%M:%S")
+            if doc.get("receiver_user_id"):
+                key = conversation_key(doc["sender_user_id"], doc["receiver_user_id"])
+            else:
+                key = team_conversation_key(doc["team_id"])
+        except (KeyError, TypeError, ValueError) as e:
+            # A malformed legacy message is left as is rather than stopping the backfill
+            logger.warning("Skipped message %s in timestamp backfill: %r", doc["_id"], e)
+            continue
+        updates.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"ts": ts, "updated_at": ts, "conversation_key": key}},
+        ))
+        if len(updates) >= batch_size:
+            updated += messages_db.bulk_write(updates, ordered=False).modified_count
+            updates = []
+    if updates:
+        updated += messages_db.bulk_write(updates, ordered=False).modified_count
+    return updated
+
+
+def dedupe_message_ids():
+    """Give fresh ids to messages that share a message_id (the old per-second ids collided).
+
+    The oldest message in each group keeps its id, so the unique index can be built.
+    """
+    updates = []
+    for group in messages_db.aggregate([
+        {"$sort": {"_id": ASCENDING}},
+        {"$group": {"_id": "$message_id", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True):
+        for doc_id in group["ids"][1:]:
+            updates.append(UpdateOne({"_id": doc_id}, {"$set": {"message_id": new_message_id()}}))
+    if updates:
+        messages_db.bulk_write(updates, ordered=False)
+    return len(updates)
+
+
+def backfill_translations(batch_size: int = 100, max_concurrency: int = 4):
+    """Translate historical DMs stored before translation_status existed.
+
+    Messages the old synchronous path already translated only have their
+    `translated` text copied into `translations.<receiver language>`. The
+    rest are grouped by language pair and each group of `batch_size` goes to
+    the LLM through `translate_batch`. Team posts have no receiver and are
+    left alone.
+    """
+    groups = {}
+    copies = []
+    updated = 0
+
+    def flush(pair):
+        docs = groups.pop(pair)
+        translations = translate_batch([doc["content"] for doc in docs], pair[0], pair[1], max_concurrency)
+        now = datetime.utcnow()
+        result = messages_db.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {
+                        f"translations.{pair[1]}": str(text).strip(),
+                        "translation_status": "done",
+                        "updated_at": now,
+                    }},
+                )
+                for doc, text in zip(docs, translations)
+            ],
+            ordered=False,
+        )
+        return result.modified_count
+
+    for doc in messages_db.find(
+        {"translation_status": {"$exists": False}, "receiver_user_id": {"$type": "string"}},
+        {"content": 1, "sender_user_id": 1, "receiver_user_id": 1, "translated": 1},
+    ):
+        pair = (get_language(doc["sender_user_id"]), get_language(doc["receiver_user_id"]))
+        if pair[0] == pair[1] or None in pair or not str(doc.get("content", "")).strip():
+            continue
+        translated = str(doc.get("translated") or "").strip()
+        if translated:
+            copies.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {f"translations.{pair[1]}": translated, "translation_status": "done"}},
+            ))
+            if len(copies) >= batch_size:
+                updated += messages_db.bulk_write(copies, ordered=False).modified_count
+                copies = []
+            continue
+        groups.setdefault(pair, []).append(doc)
+        if len(groups[pair]) >= batch_size:
+            updated += flush(pair)
+    if copies:
+        updated += messages_db.bulk_write(copies, ordered=False).modified_count
+    for pair in list(groups):
+        updated += flush(pair)
+    return updated
+
+
+def ensure_indexes():
+    """Create every index the queries and upserts above rely on.
+
+    Each index is attempted on its own, so one failure (e.g. duplicate
+    message_ids blocking the unique index) does not skip the rest. If the
+    server cannot be reached, the remaining indexes are not attempted, so an
+    import waits one server-selection timeout rather than one per index.
+    """
+    indexes = [
+        (messages_db, [("conversation_key", ASCENDING), ("ts", DESCENDING), ("_id", DESCENDING)], {}),
+        (messages_db, [("conversation_key", ASCENDING), ("updated_at", ASCENDING)], {}),
+        (messages_db, [("team_id", ASCENDING), ("ts", DESCENDING), ("_id", DESCENDING)], {}),
+        (messages_db, [("translation_status", ASCENDING)], {"partialFilterExpression": {"translation_status": "pending"}}),
+        (messages_db, [("message_id", ASCENDING)], {"unique": True}),
+        (teams_db, [("team_id", ASCENDING)], {"unique": True}),
+        (teams_db, [("participants", ASCENDING)], {}),
+        (read_cursors_db, [("user_id", ASCENDING), ("conversation_key", ASCENDING)], {"unique": True}),
+        # Serves both the per-DM upserts and the sidebar's find by user_id
+        (conversations_db, [("user_id", ASCENDING), ("conversation_key", ASCENDING)], {"unique": True}),
+        (presence_db, [("user_id", ASCENDING)], {"unique": True}),
+        (presence_db, [("last_seen", ASCENDING)], {"expireAfterSeconds": PRESENCE_TTL_SECONDS}),
+    ]
+    failed = 0
+    for position, (collection, keys, options) in enumerate(indexes):
+        try:
+            collection.create_index(keys, **options)
+        except ConnectionFailure as e:
+            failed += len(indexes) - position
+            logger.error("MongoDB unreachable, %d indexes not checked: %s", len(indexes) - position, e)
+            return failed
+        except Exception as e:
+            failed += 1
+            logger.error("Index %s on %s not created: %s", keys, collection.name, e)
+    if failed:
+        logger.error("%d indexes missing; run `python -m utils.db_manager --migrate` if legacy data blocks them", failed)
+    return failed
+
+
+def run_migrations():
+    """One-off data fixes for messages stored by older versions, then the indexes they unblock."""
+    logger.warning("Re-keyed %d messages with duplicate message_id", dedupe_message_ids())
+    logger.warning("Backfilled ts/conversation_key on %d messages", backfill_message_timestamps())
+    logger.warning("Seeded %d DM conversation states", backfill_conversation_states())
+    return ensure_indexes()
+
+
+def needs_migration() -> bool:
+    """Whether messages from before conversation_key exist; history queries cannot see them.
+
+    One find_one served by the conversation_key indexes (missing matches null).
+    """
+    return messages_db.find_one({"conversation_key": None}, {"_id": 1}) is not None
+
+
+if not ensure_indexes():
+    try:
+        if needs_migration():
+            logger.warning("Messages without ts/conversation_key found; they are missing from chat history "
+                           "until `python -m utils.db_manager --migrate` is run")
+    except Exception as e:
+        logger.error("Migration check failed: %s", e)
+
+# --------------------------------------
+# Translation workers
+# --------------------------------------
+# Nothing starts at import: scripts that only read (task scanner, benchmarks,
+# migrations) get no threads, and only the app re-submits pending work.
+_translation_pool = None
+_translation_requeued = False
+_translation_lock = threading.Lock()
+
+
+def get_translation_pool() -> TranslationWorkerPool:
+    """This process's translation workers, started on first use."""
+    global _translation_pool
+    with _translation_lock:
+        if _translation_pool is None:
+            _translation_pool = TranslationWorkerPool(
+                messages_db, translate_text, workers=int(os.getenv("TRANSLATION_WORKERS", "2")),
+                lease_seconds=float(os.getenv("TRANSLATION_LEASE_SECONDS", "300")),
+            )
+            register_collector("translation_workers", _translation_pool.stats)
+        return _translation_pool
+
+
+def start_translation_workers() -> TranslationWorkerPool:
+    """Start the workers and, once per process, re-submit translations left pending.
+
+    Called from the app entry point. Leases on the messages keep several app
+    processes from translating the same language twice; every
+    TRANSLATION_REQUEUE_SECONDS, jobs whose lease expired are submitted again.
+    """
+    global _translation_requeued
+    pool = get_translation_pool()
+    with _translation_lock:
+        if _translation_requeued:
+            return pool
+        _translation_requeued = True
+    try:
+        pool.requeue_pending(get_language)
+    except Exception as e:
+        logger.error("Could not requeue pending translations: %s", e)
+    pool.start_requeue_loop(get_language, float(os.getenv("TRANSLATION_REQUEUE_SECONDS", "60")))
+    return pool
 
 
         
@@ -176,3 +643,22 @@ def add_message(sender_id: str, receiver_id: str, content: str, team_id: int = 0
 #     """Fetch all users with only user_id and name"""
 #     return list(users_col.find({}, {"_id": 0, "user_id": 1, "name": 1}))
 
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m utils.db_manager --migrate
+    parser = argparse.ArgumentParser(description="TeamSync message data maintenance.")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Re-key duplicate message_ids, backfill legacy messages and DM states, then build indexes.")
+    parser.add_argument("--translations", action="store_true",
+                        help="Translate legacy DMs that predate translation_status (calls the LLM).")
+    args = parser.parse_args()
+
+    if args.migrate:
+        logging.basicConfig(level=logging.INFO)
+        missing = run_migrations()
+        print("✅ Migrations done" if not missing else f"❌ {missing} indexes still missing")
+    if args.translations:
+        print(f"✅ Backfilled translations on {backfill_translations()} messages")
+    if not (args.migrate or args.translations):
+        parser.print_help()
@@ -0,0 +1,146 @@
+import os
+import threading
+
+import joblib
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from .metrics import timed, register_collector
+
+
+# --------------------------------------
+# Configuration (override with environment variables)
+# --------------------------------------
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTENT_MODEL_DIR = os.getenv("INTENT_MODEL_DIR", os.path.join(BACKEND_DIR, "intent_model"))
+# LoRA adapter from `intent-identifier-peft.py --mode lora`; preferred when present
+INTENT_ADAPTER_DIR = os.getenv("INTENT_ADAPTER_DIR", os.path.join(BACKEND_DIR, "intent_adapter"))
+TORCHSCRIPT_FILE = "intent_int8.torchscript.pt"  # written by intent-export.py
+# "auto" uses the quantized TorchScript export when it exists, else the eager model
+INTENT_BACKEND = os.getenv("INTENT_BACKEND", "auto")
+# Labels from intent-identifier-peft.py's label encoder that mean "has a task"
+TASK_LABELS = tuple(label.strip() for label in os.getenv("INTENT_TASK_LABELS", "event,reminder").split(","))
+GATE_THRESHOLD = float(os.getenv("INTENT_GATE_THRESHOLD", "0.5"))
+BATCH_SIZE = int(os.getenv("INTENT_BATCH_SIZE", "32"))
+MAX_LENGTH = 64
+
+_lock = threading.Lock()
+_loaded = {}
+_gate_stats = {"scored": 0, "passed": 0, "skipped": 0}
+
+
+def model_dir():
+    """Directory of the current classifier: the LoRA adapter if one was trained, else the full model."""
+    if os.path.exists(os.path.join(INTENT_ADAPTER_DIR, "adapter_config.json")):
+        return INTENT_ADAPTER_DIR
+    return INTENT_MODEL_DIR
+
+
+def model_available() -> bool:
+    """Whether a trained classifier is present; the repo ships none, see intent-identifier-peft.py."""
+    return os.path.exists(os.path.join(model_dir(), "label_encoder.pkl"))
+
+
+def load_eager_model():
+    """Tokenizer, eval-mode PyTorch model and label names.
+
+    An adapter is applied to its base model and merged in, so inference runs
+    a plain model with no PEFT overhead.
+    """
+    source = model_dir()
+    tokenizer = AutoTokenizer.from_pretrained(source)
+    label_encoder = joblib.load(os.path.join(source, "label_encoder.pkl"))
+    labels = [str(label) for label in label_encoder.classes_]
+    if source == INTENT_ADAPTER_DIR:
+        from peft import PeftConfig, PeftModel
+        base_name = PeftConfig.from_pretrained(source).base_model_name_or_path
+        base = AutoModelForSequenceClassification.from_pretrained(base_name, num_labels=len(labels))
+        model = PeftModel.from_pretrained(base, source).merge_and_unload()
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(source)
+    model.eval()
+    return tokenizer, model, labels
+
+
+def _resolve_backend(backend):
+    backend = backend or INTENT_BACKEND
+    if backend == "auto":
+        exported = os.path.exists(os.path.join(model_dir(), TORCHSCRIPT_FILE))
+        return "torchscript" if exported else "eager"
+    return backend
+
+
+def load_intent_model(backend: str = None):
+    """Load the tokenizer, a logits function and the labels once per process (CPU).
+
+    `backend` is "eager" (the saved PyTorch checkpoint or adapter), "torchscript"
+    (the int8 export from intent-export.py) or "auto". Raises ValueError when
+    none of INTENT_TASK_LABELS is a class of the model, since every message
+    would then be gated out.
+    """
+    backend = _resolve_backend(backend)
+    with _lock:
+        if backend not in _loaded:
+            if backend == "torchscript":
+                source = model_dir()
+                tokenizer = AutoTokenizer.from_pretrained(source)
+                labels = [str(label) for label in joblib.load(os.path.join(source, "label_encoder.pkl")).classes_]
+                scripted = torch.jit.load(os.path.join(source, TORCHSCRIPT_FILE), map_location="cpu")
+                scripted.eval()
+                forward = scripted
+            else:
+                tokenizer, model, labels = load_eager_model()
+                forward = lambda input_ids, attention_mask: model(input_ids=input_ids, attention_mask=attention_mask).logits
+            task_ids = [labels.index(label) for label in TASK_LABELS if label in labels]
+            if not task_ids:
+                raise ValueError(f"None of INTENT_TASK_LABELS {list(TASK_LABELS)} is a label of the intent model {labels}")
+            _loaded[backend] = (tokenizer, forward, labels, task_ids)
+    return _loaded[backend]
+
+
+@timed("teamsync_intent_classify")
+def classify(messages, batch_size: int = BATCH_SIZE, backend: str = None):
+    """Return (label, task_probability) for each message, scored in batches.
+
+    Messages are grouped by length before batching and each batch is padded
+    only to its own longest message, so short chat lines are not padded out
+    to MAX_LENGTH.
+    """
+    tokenizer, forward, labels, task_ids = load_intent_model(backend)
+    texts = [str(m) for m in messages]
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    results = [None] * len(texts)
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            inputs = tokenizer([texts[i] for i in idx], truncation=True, padding=True,
+                               max_length=MAX_LENGTH, return_tensors="pt")
+            probs = torch.softmax(forward(inputs["input_ids"], inputs["attention_mask"]), dim=-1)
+            for i, row in zip(idx, probs):
+                results[i] = (labels[int(row.argmax())], float(row[task_ids].sum()))
+    return results
+
+
+def gate_messages(messages, threshold: float = None):
+    """True for each message that should go on to the LLM task extractor.
+
+    A message passes when the classifier's combined probability for the
+    task labels (event/reminder by default) is at least `threshold`.
+    """
+    threshold = GATE_THRESHOLD if threshold is None else threshold
+    decisions = [probability >= threshold for _, probability in classify(messages)]
+    with _lock:
+        _gate_stats["scored"] += len(decisions)
+        _gate_stats["passed"] += sum(decisions)
+        _gate_stats["skipped"] += len(decisions) - sum(decisions)
+    return decisions
+
+
+def get_gate_stats():
+    with _lock:
+        stats = dict(_gate_stats)
+    stats["skip_rate"] = stats["skipped"] / stats["scored"] if stats["scored"] else 0.0
+    return stats
+
+
+register_collector("intent_gate", get_gate_stats)
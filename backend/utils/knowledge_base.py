@@ -0,0 +1,174 @@
+import argparse
+import os
+import threading
+
+from langchain_ollama import ChatOllama, OllamaEmbeddings
+
+from .vector_index import DOCUMENTS_DIR, open_index, ingest, source_name
+from .semantic_cache import EmbeddingCache, SemanticAnswerCache
+from .stream_utils import strip_think_stream
+from .metrics import timed, register_collector
+
+
+# --------------------------------------
+# One embedding model, one LLM and one index for every document
+# --------------------------------------
+COLLECTION_NAME = "teamsync_knowledge"
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".md")
+EMBEDDING_MODEL_NAME = os.getenv("RAG_EMBEDDING_MODEL", "nomic-embed-text")
+LLM_MODEL_NAME = os.getenv("RAG_LLM_MODEL", "qwen3:0.6b")
+
+embedding_model = OllamaEmbeddings(model=EMBEDDING_MODEL_NAME)
+model = ChatOllama(model=LLM_MODEL_NAME, temperature=0.7)
+vector_store = open_index(embedding_model, COLLECTION_NAME)
+
+# Repeated and near-duplicate questions skip the embedding call and the LLM
+embedding_cache = EmbeddingCache(embedding_model.embed_query)
+answer_cache = SemanticAnswerCache(
+    threshold=float(os.getenv("RAG_ANSWER_CACHE_THRESHOLD", "0.92")),
+    ttl_seconds=int(os.getenv("RAG_ANSWER_CACHE_TTL", "3600")),
+)
+
+register_collector("rag_embedding_cache", embedding_cache.stats)
+register_collector("rag_answer_cache", answer_cache.stats)
+
+_ingest_lock = threading.Lock()
+_ingested = False
+index_version = 0
+
+
+def list_documents(documents_dir: str = DOCUMENTS_DIR):
+    """Every supported file under documents_dir, recursively."""
+    paths = []
+    for root, _, files in os.walk(documents_dir):
+        for name in files:
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def ingest_documents(documents_dir: str = DOCUMENTS_DIR):
+    """Sync the index with documents_dir; unchanged files cost nothing.
+
+    Any change to the index bumps `index_version`, which retires every
+    cached answer.
+    """
+    global _ingested, index_version
+    with _ingest_lock:
+        stats = ingest(vector_store, COLLECTION_NAME, list_documents(documents_dir), prune=True, documents_dir=documents_dir)
+        if stats["chunks_added"] or stats["chunks_removed"]:
+            index_version += 1
+            answer_cache.invalidate()
+        _ingested = True
+    return stats
+
+
+def _ensure_ingested():
+    if not _ingested:
+        ingest_documents()
+
+
+def list_sources():
+    """Names of the documents that can be used as a `source` filter."""
+    return [source_name(path) for path in list_documents()]
+
+
+def _where(source, filter):
+    """Chroma `where` for a source and metadata filter; Chroma allows one top-level key, so several are $and-ed."""
+    conditions = dict(filter or {})
+    if source is not None:
+        conditions["source"] = source
+    if len(conditions) > 1:
+        return {"$and": [{key: conditions[key]} for key in sorted(conditions)]}
+    return conditions or None
+
+
+def retrieve(question: str, k: int = 2, source: str = None, filter: dict = None):
+    """Top-k chunks for the question, optionally limited by source document or metadata."""
+    _ensure_ingested()
+    vector = embedding_cache.embed(question)
+    return vector_store.similarity_search_by_vector(vector.tolist(), k=k, filter=_where(source, filter))
+
+
+def build_prompt(question: str, retrieved_docs) -> str:
+    context = "\n\n".join(doc.page_content for doc in retrieved_docs)
+    return (
+        f"Answer the question based ONLY on the following context:\n{context}\n\n"
+        f"Question: {question}\nAnswer:"
+    )
+
+
+def _lookup(question, k, source, filter):
+    _ensure_ingested()
+    where = _where(source, filter)
+    scope = (k, repr(sorted((where or {}).items())))
+    vector = embedding_cache.embed(question)
+    return vector, where, scope, answer_cache.lookup(vector, scope, index_version)
+
+
+def _sources(retrieved_docs):
+    return sorted({doc.metadata.get("source") for doc in retrieved_docs})
+
+
+def answer_question(question: str, k: int = 2, source: str = None, filter: dict = None) -> dict:
+    """Answer from the knowledge base; returns the answer and the documents it drew on."""
+    vector, where, scope, cached = _lookup(question, k, source, filter)
+    if cached is not None:
+        return cached
+
+    with timed("teamsync_rag_retrieve"):
+        retrieved_docs = vector_store.similarity_search_by_vector(vector.tolist(), k=k, filter=where)
+    with timed("teamsync_llm_request", op="rag"):
+        response = model.invoke([{"role": "user", "content": build_prompt(question, retrieved_docs)}])
+    result = {
+        "answer": "".join(strip_think_stream([response.content])).strip(),
+        "sources": _sources(retrieved_docs),
+    }
+    answer_cache.store(vector, scope, index_version, result)
+    return result
+
+
+def stream_answer(question: str, k: int = 2, source: str = None, filter: dict = None):
+    """Like answer_question, but yields answer tokens as the model produces them.
+
+    qwen3's <think> block is dropped on the fly, so the first yielded token
+    is the start of the answer. The generator can be passed straight to
+    `st.write_stream`. A cached answer is yielded in one piece.
+    """
+    vector, where, scope, cached = _lookup(question, k, source, filter)
+    if cached is not None:
+        yield cached["answer"]
+        return
+
+    with timed("teamsync_rag_retrieve"):
+        retrieved_docs = vector_store.similarity_search_by_vector(vector.tolist(), k=k, filter=where)
+    parts = []
+    with timed("teamsync_llm_request", op="rag_stream"):
+        stream = model.stream([{"role": "user", "content": build_prompt(question, retrieved_docs)}])
+        for token in strip_think_stream(chunk.content for chunk in stream):
+            parts.append(token)
+            yield token
+    answer_cache.store(vector, scope, index_version, {"answer": "".join(parts).strip(), "sources": _sources(retrieved_docs)})
+
+
+def get_cache_stats():
+    return {"embeddings": embedding_cache.stats(), "answers": answer_cache.stats(), "index_version": index_version}
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m utils.knowledge_base [--source "Leave Policy.pdf"]
+    parser = argparse.ArgumentParser(description="Ask questions against the TeamSync knowledge base.")
+    parser.add_argument("--source", help="Only answer from this document (file name under documents/).")
+    args = parser.parse_args()
+
+    print(f"Index update: {ingest_documents()}")
+    print(f"Documents: {', '.join(list_sources())}")
+
+    while True:
+        user_question = input("Enter: ")
+        if user_question.lower() == 'exit':
+            break
+        print("Answer: ", end="", flush=True)
+        for token in stream_answer(user_question, source=args.source):
+            print(token, end="", flush=True)
+        print("\n")
@@ -0,0 +1,276 @@
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------
+# Configuration (override with environment variables)
+# --------------------------------------
+# Port for the Prometheus text endpoint; unset means no endpoint
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# --------------------------------------
+# Metric types
+# --------------------------------------
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _labels(self, key, extra=None):
+        pairs = list(zip(self.label_names, key)) + list((extra or {}).items())
+        return {name: value for name, value in pairs if value != ""}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self._labels(key), value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self._labels(key), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            # Buckets are cumulative: each counts observations <= its bound
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        for key, counts, total, count in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", self._labels(key, {"le": repr(bound)}), bucket_count
+            yield f"{self.name}_bucket", self._labels(key, {"le": "+Inf"}), count
+            yield f"{self.name}_sum", self._labels(key), total
+            yield f"{self.name}_count", self._labels(key), count
+
+
+# --------------------------------------
+# Registry
+# --------------------------------------
+class Registry:
+    """Process-wide metrics plus collectors that turn existing stats() dicts into gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = {}
+
+    def _get(self, cls, name, help_text, label_names, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, help_text, label_names, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, help_text: str = "", label_names=()) -> Counter:
+        return self._get(Counter, name, help_text, label_names)
+
+    def gauge(self, name: str, help_text: str = "", label_names=()) -> Gauge:
+        return self._get(Gauge, name, help_text, label_names)
+
+    def histogram(self, name: str, help_text: str = "", label_names=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, label_names, buckets=buckets)
+
+    def register_collector(self, name: str, stats_fn):
+        """Export the numeric values of `stats_fn()` as gauges teamsync_<name>_<key>."""
+        with self._lock:
+            self._collectors[name] = stats_fn
+
+    def _collected(self):
+        with self._lock:
+            collectors = list(self._collectors.items())
+        for name, stats_fn in collectors:
+            try:
+                stats = stats_fn()
+            except Exception as e:
+                stats = {}
+                logger.warning("Metrics collector %s failed: %s", name, e)
+            for key, value in stats.items():
+                if isinstance(value, (int, float)):
+                    yield f"teamsync_{name}_{key}", float(value)
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            if metric.help_text:
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(labels)} {value}")
+        for name, value in self._collected():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+register_collector = REGISTRY.register_collector
+render_prometheus = REGISTRY.render_prometheus
+
+
+# --------------------------------------
+# Timing helper
+# --------------------------------------
+class timed:
+    """Time a block or a function into `<name>_seconds`.
+
+    Also maintains `<name>_in_flight` and `<name>_errors_total`, all with the
+    given labels. Works as a context manager (`with timed("x", op="y"):`) and
+    as a decorator; a decorated generator is timed until it is exhausted.
+    """
+
+    def __init__(self, name: str, **labels):
+        self.name = name
+        self.labels = labels
+        label_names = sorted(labels)
+        self.seconds = histogram(f"{name}_seconds", f"Duration of {name}", label_names)
+        self.in_flight = gauge(f"{name}_in_flight", f"{name} currently running", label_names)
+        self.errors = counter(f"{name}_errors_total", f"{name} calls that raised", label_names)
+        self._started = None
+
+    def __enter__(self):
+        self.in_flight.inc(**self.labels)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds.observe(time.perf_counter() - self._started, **self.labels)
+        self.in_flight.dec(**self.labels)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            self.errors.inc(**self.labels)
+        return False
+
+    def __call__(self, fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                with timed(self.name, **self.labels):
+                    yield from fn(*args, **kwargs)
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(self.name, **self.labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+# --------------------------------------
+# Prometheus endpoint
+# --------------------------------------
+_server = None
+_server_lock = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int = None, host: str = METRICS_HOST):
+    """Serve /metrics from a daemon thread, once per process.
+
+    Without `port`, METRICS_PORT decides; if neither is set nothing starts.
+    Safe to call on every Streamlit rerun.
+    """
+    global _server
+    port = port or METRICS_PORT
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            except OSError as e:
+                logger.warning("Metrics endpoint not started on %s:%s: %s", host, port, e)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info("Metrics at http://%s:%s/metrics", host, port)
+    return _server
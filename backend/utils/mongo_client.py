@@ -0,0 +1,181 @@
+import logging
+import os
+import threading
+
+import certifi
+from pymongo import MongoClient, monitoring
+from pymongo.errors import ConfigurationError
+
+from .creds import URL
+from .metrics import histogram, counter, gauge, register_collector
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------
+# Configuration (override with environment variables)
+# --------------------------------------
+# "mongomock://" runs against an in-process fake (benchmarks only)
+MONGO_URI = os.getenv("TEAMSYNC_MONGO_URI", URL)
+DATABASE_NAME = os.getenv("TEAMSYNC_DB", "TEAMSYNC-DB")
+MAX_POOL_SIZE = int(os.getenv("TEAMSYNC_MONGO_MAX_POOL_SIZE", "50"))
+MIN_POOL_SIZE = int(os.getenv("TEAMSYNC_MONGO_MIN_POOL_SIZE", "0"))
+MAX_IDLE_TIME_MS = int(os.getenv("TEAMSYNC_MONGO_MAX_IDLE_TIME_MS", "300000"))
+WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("TEAMSYNC_MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("TEAMSYNC_MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+CONNECT_TIMEOUT_MS = int(os.getenv("TEAMSYNC_MONGO_CONNECT_TIMEOUT_MS", "10000"))
+SOCKET_TIMEOUT_MS = int(os.getenv("TEAMSYNC_MONGO_SOCKET_TIMEOUT_MS", "30000"))
+READ_PREFERENCE = os.getenv("TEAMSYNC_MONGO_READ_PREFERENCE", "primaryPreferred")
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Counts connection pool events so utilization can be read at runtime."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.created = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pools_cleared = 0
+
+    def _bump(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump(pools_cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._bump(created=1, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(closed=1, open=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._bump(checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._bump(checkouts=1, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._bump(checked_out=-1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_pool_size": MAX_POOL_SIZE,
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "utilization": self.checked_out / MAX_POOL_SIZE if MAX_POOL_SIZE else 0.0,
+                "created": self.created,
+                "closed": self.closed,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pools_cleared": self.pools_cleared,
+            }
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Times every command the driver sends, by command name (find, insert, aggregate, ...)."""
+
+    def __init__(self):
+        self.seconds = histogram("teamsync_mongo_command_seconds", "MongoDB command round-trip time", ["command"])
+        self.failures = counter("teamsync_mongo_command_failures_total", "MongoDB commands that failed", ["command"])
+        self.in_flight = gauge("teamsync_mongo_commands_in_flight", "MongoDB commands awaiting a reply")
+
+    def started(self, event):
+        self.in_flight.inc()
+
+    def succeeded(self, event):
+        self.in_flight.dec()
+        self.seconds.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        self.in_flight.dec()
+        self.seconds.observe(event.duration_micros / 1e6, command=event.command_name)
+        self.failures.inc(command=event.command_name)
+
+
+pool_metrics = PoolMetrics()
+command_metrics = CommandMetrics()
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> MongoClient:
+    """Return the process-wide MongoClient, creating it on first use.
+
+    MongoClient connects in the background, so creating it does not wait for
+    a TLS handshake or a ping; the first real operation waits for the server
+    instead. A mongodb+srv:// URI is the exception: the SRV and TXT records
+    are resolved synchronously here, and if DNS fails this raises
+    ConfigurationError (so importing db_manager or auth fails with it).
+    Streamlit keeps imported modules across reruns and pages, so every page
+    in the process shares this one client and its pool.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None and MONGO_URI.startswith("mongomock://"):
+                import mongomock
+                _client = mongomock.MongoClient()
+            if _client is None:
+                options = {
+                    "maxPoolSize": MAX_POOL_SIZE,
+                    "minPoolSize": MIN_POOL_SIZE,
+                    "maxIdleTimeMS": MAX_IDLE_TIME_MS,
+                    "waitQueueTimeoutMS": WAIT_QUEUE_TIMEOUT_MS,
+                    "serverSelectionTimeoutMS": SERVER_SELECTION_TIMEOUT_MS,
+                    "connectTimeoutMS": CONNECT_TIMEOUT_MS,
+                    "socketTimeoutMS": SOCKET_TIMEOUT_MS,
+                    "readPreference": READ_PREFERENCE,
+                    "event_listeners": [pool_metrics, command_metrics],
+                }
+                if MONGO_URI.startswith("mongodb+srv://"):
+                    options.update(tls=True, tlsCAFile=certifi.where())
+                try:
+                    _client = MongoClient(MONGO_URI, **options)
+                except ConfigurationError as e:
+                    logger.error("MongoDB URI could not be resolved (check DNS/network or TEAMSYNC_MONGO_URI): %s", e)
+                    raise
+    return _client
+
+
+def get_database(name: str = None):
+    return get_client()[name or DATABASE_NAME]
+
+
+def ping() -> bool:
+    """Health check; not needed before using the client."""
+    try:
+        get_client().admin.command("ping")
+        return True
+    except Exception as e:
+        logger.error("MongoDB connection failed: %s", e)
+        return False
+
+
+def get_pool_stats():
+    return pool_metrics.stats()
+
+
+register_collector("mongo_pool", get_pool_stats)
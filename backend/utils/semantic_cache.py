@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+class EmbeddingCache:
+    """LRU of question text -> embedding vector, so repeats skip the embedding call."""
+
+    def __init__(self, embed_fn, max_entries: int = 2000):
+        self.embed_fn = embed_fn
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, question: str):
+        key = normalize_question(question)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        vector = np.asarray(self.embed_fn(key), dtype=np.float32)
+        with self._lock:
+            self._entries[key] = vector
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return vector
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class SemanticAnswerCache:
+    """Answers keyed by question embedding; a near-duplicate question reuses the answer.
+
+    A cached answer is returned when its question's cosine similarity to the
+    new one is at least `threshold`, it was produced for the same scope
+    (retrieval settings and filters) and index version, and it is younger
+    than `ttl_seconds`.
+    """
+
+    def __init__(self, threshold: float = 0.92, ttl_seconds: int = 3600, max_entries: int = 1000):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def lookup(self, vector, scope, index_version):
+        now = time.monotonic()
+        unit = vector / (np.linalg.norm(vector) or 1.0)
+        with self._lock:
+            self._entries = [e for e in self._entries if now - e["created"] < self.ttl_seconds]
+            candidates = [e for e in self._entries if e["scope"] == scope and e["index_version"] == index_version]
+            if candidates:
+                scores = np.stack([e["unit"] for e in candidates]) @ unit
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self.hits += 1
+                    return candidates[best]["answer"]
+            self.misses += 1
+            return None
+
+    def store(self, vector, scope, index_version, answer):
+        unit = vector / (np.linalg.norm(vector) or 1.0)
+        with self._lock:
+            self._entries.append({
+                "unit": unit,
+                "scope": scope,
+                "index_version": index_version,
+                "answer": answer,
+                "created": time.monotonic(),
+            })
+            if len(self._entries) > self.max_entries:
+                self._entries = self._entries[-self.max_entries:]
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = []
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
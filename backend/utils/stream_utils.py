@@ -0,0 +1,69 @@
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+class ThinkTagFilter:
+    """Removes <think>...</think> blocks from a token stream as it arrives.
+
+    Tags can be split across chunks, so text that could be the start of a
+    tag is held back until the next chunk settles it.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        """Return the part of `chunk` (plus held-back text) that is safe to show."""
+        self._buffer += chunk
+        out = []
+        while self._buffer:
+            tag = THINK_CLOSE if self._inside else THINK_OPEN
+            idx = self._buffer.find(tag)
+            if idx >= 0:
+                if not self._inside:
+                    out.append(self._buffer[:idx])
+                self._buffer = self._buffer[idx + len(tag):]
+                self._inside = not self._inside
+                continue
+            keep = _partial_suffix(self._buffer, tag)
+            if not self._inside:
+                out.append(self._buffer[:len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            break
+        return self._emit("".join(out))
+
+    def flush(self) -> str:
+        """Release anything still held back once the stream has ended."""
+        text = "" if self._inside else self._buffer
+        self._buffer = ""
+        return self._emit(text)
+
+    def _emit(self, text: str) -> str:
+        # Like the old post-hoc strip(): drop whitespace the model leaves
+        # between the think block and the answer.
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+
+def _partial_suffix(text: str, tag: str) -> int:
+    """Length of the longest suffix of `text` that is a proper prefix of `tag`."""
+    for size in range(min(len(text), len(tag) - 1), 0, -1):
+        if tag.startswith(text[-size:]):
+            return size
+    return 0
+
+
+def strip_think_stream(chunks):
+    """Wrap an iterable of text chunks, yielding them with think blocks removed."""
+    think_filter = ThinkTagFilter()
+    for chunk in chunks:
+        text = think_filter.feed(chunk)
+        if text:
+            yield text
+    tail = think_filter.flush()
+    if tail:
+        yield tail
@@ -1,10 +1,48 @@
 import requests
 import json
-from typing import Dict, List
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional
+
+from .metrics import timed, register_collector
+
+logger = logging.getLogger(__name__)
 
 # --- Configuration ---
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
+OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate")
 MODEL_NAME = "gemma3:1b"
+REQUEST_TIMEOUT = 30  # seconds per request
+DEFAULT_CONCURRENCY = int(os.getenv("TASK_DETECTION_CONCURRENCY", "4"))
+ERROR_RESULT = "ERROR: Could not connect to LLM."
+
+# -------------------------------
+# Shared HTTP session (keep-alive connection pool to Ollama)
+# -------------------------------
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+def get_session(pool_size: int = DEFAULT_CONCURRENCY) -> requests.Session:
+    """Return the shared session, with room for at least pool_size kept-alive connections.
+
+    The pool grows to the largest concurrency any caller has asked for, so a
+    wide detect_tasks after a single detect_task still reuses its connections.
+    """
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update({'Content-Type': 'application/json'})
+        if pool_size > _session_pool_size:
+            # Requests already in flight finish on the old adapters
+            _session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+            _session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+            _session_pool_size = pool_size
+    return _session
 
 # -------------------------------
 # 1. Few-Shot Examples and Prompt Components
@@ -32,66 +70,156 @@ few_shot_examples: List[Dict[str, str]] = [
 EXAMPLE_TEMPLATE = "message: {message}\ntask: {task}"
 EXAMPLE_SEPARATOR = "\n\n"
 
-# The original prefix and suffix logic is now handled in the main function
+INSTRUCTION = "You are a event detector from conversation message. Extract the task or event from the user's message. Understand the message and identify any event or task from that. Output only the task string in a single line. Don't keep context of previous messages. Just task detection from this message. If there is no task, leave it empty. And use <PERSON> as a placeholder for any person which will be replaced later. But make sure to keep that tag. Providing you some examples as part of few shot learning. Generate answers accordingly.\n\n"
+
+# The instruction and examples never change, so they are joined once at import.
+# They go to Ollama as the `system` prompt and only the `message:` suffix varies,
+# which keeps the token prefix byte-identical across requests; with the model
+# kept loaded (KEEP_ALIVE) Ollama reuses its KV cache for that prefix and
+# evaluates just the new suffix.
+STATIC_PROMPT_PREFIX = INSTRUCTION + EXAMPLE_SEPARATOR.join(
+    EXAMPLE_TEMPLATE.format(message=ex["message"], task=ex["task"])
+    for ex in few_shot_examples
+) + EXAMPLE_SEPARATOR
+KEEP_ALIVE = os.getenv("TASK_DETECTION_KEEP_ALIVE", "30m")
+
+def build_suffix(user_input: str) -> str:
+    return f"message: {user_input}\ntask:"
 
 def build_prompt(user_input: str) -> str:
     """Constructs the full few-shot prompt string."""
-    
-    # 1. Define Prefix
-    prefix = "You are a event detector from conversation message. Extract the task or event from the user's message. Understand the message and identify any event or task from that. Output only the task string in a single line. Don't keep context of previous messages. Just task detection from this message. If there is no task, leave it empty. And use <PERSON> as a placeholder for any person which will be replaced later. But make sure to keep that tag. Providing you some examples as part of few shot learning. Generate answers accordingly.\n\n"
-    
-    # 2. Add Examples
-    examples_str = EXAMPLE_SEPARATOR.join(
-        EXAMPLE_TEMPLATE.format(message=ex["message"], task=ex["task"])
-        for ex in few_shot_examples
-    )
-    
-    # 3. Define Suffix for the new input
-    suffix = f"message: {user_input}\ntask:"
-    
-    return prefix + examples_str + EXAMPLE_SEPARATOR + suffix
+    return STATIC_PROMPT_PREFIX + build_suffix(user_input)
 
-
-def detect_task(message: str) -> str:
-    """Sends the formatted prompt directly to the Ollama API."""
-    full_prompt = build_prompt(message)
-    
-    payload = {
+def build_payload(message: str, stream: bool = False) -> dict:
+    return {
         "model": MODEL_NAME,
-        "prompt": full_prompt,
-        "stream": False,  # We want a single, complete response
+        "system": STATIC_PROMPT_PREFIX,
+        "prompt": build_suffix(message),
+        "stream": stream,
+        "keep_alive": KEEP_ALIVE,
         "options": {
             "temperature": 0.0,
             # Max tokens is useful to ensure the model doesn't generate too much extra content
-            "num_predict": 100 
+            "num_predict": 100
         }
     }
+
+# -------------------------------
+# Prompt-eval accounting (from Ollama's response counters)
+# -------------------------------
+_eval_lock = threading.Lock()
+_eval_stats = {"requests": 0, "prompt_eval_tokens": 0, "prompt_eval_seconds": 0.0, "eval_tokens": 0}
+
+def _record_eval(result: dict):
+    with _eval_lock:
+        _eval_stats["requests"] += 1
+        _eval_stats["prompt_eval_tokens"] += result.get("prompt_eval_count", 0)
+        _eval_stats["prompt_eval_seconds"] += result.get("prompt_eval_duration", 0) / 1e9
+        _eval_stats["eval_tokens"] += result.get("eval_count", 0)
+
+def get_prompt_eval_stats() -> dict:
+    """Prompt tokens Ollama actually evaluated, in total and per request.
+
+    With the prefix cached, `avg_prompt_eval_tokens` should sit near the size
+    of the `message:` suffix rather than the full few-shot prompt.
+    """
+    with _eval_lock:
+        stats = dict(_eval_stats)
+    requests_made = stats["requests"] or 1
+    stats["avg_prompt_eval_tokens"] = stats["prompt_eval_tokens"] / requests_made
+    stats["avg_prompt_eval_seconds"] = stats["prompt_eval_seconds"] / requests_made
+    return stats
+
+
+register_collector("task_detection", get_prompt_eval_stats)
+
+
+def detect_task(message: str, timeout: float = REQUEST_TIMEOUT) -> str:
+    """Sends the formatted prompt directly to the Ollama API."""
+    payload = build_payload(message, stream=False)  # We want a single, complete response
     
     try:
-        # Make the synchronous POST request
-        response = requests.post(
-            OLLAMA_API_URL,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=30 # Set a reasonable timeout
-        )
-        response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
+        # Make the synchronous POST request over the shared keep-alive session
+        with timed("teamsync_llm_request", op="detect"):
+            response = get_session().post(
+                OLLAMA_API_URL,
+                json=payload,
+                timeout=timeout
+            )
+            response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
 
         # Ollama returns a JSON response, we extract the 'response' field
         result = response.json()
+        _record_eval(result)
         output = result.get("response", "").strip()
 
         # Clean output
         return output.replace("\n", " ").strip()
 
     except requests.exceptions.RequestException as e:
-        print(f"Error communicating with Ollama API: {e}")
-        print("Please ensure the Ollama server is running and the model is pulled.")
-        return f"ERROR: Could not connect to LLM."
+        logger.error("Error communicating with Ollama API: %s. "
+                     "Please ensure the Ollama server is running and the model is pulled.", e)
+        return ERROR_RESULT
+
+
+def detect_tasks(messages: List[str], max_workers: int = DEFAULT_CONCURRENCY,
+                 timeout: float = REQUEST_TIMEOUT, deadline: Optional[float] = None) -> List[str]:
+    """Detect tasks for many messages concurrently; results line up with `messages`.
+
+    At most `max_workers` requests are in flight over the shared session.
+    `timeout` bounds each request; `deadline` (seconds) bounds the whole
+    batch, and messages not finished by then get ERROR_RESULT.
+    """
+    if not messages:
+        return []
+    get_session(max_workers)
+    results = [ERROR_RESULT] * len(messages)
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(detect_task, message, timeout): i for i, message in enumerate(messages)}
+        done, not_done = wait(futures, timeout=deadline)
+        for future in done:
+            results[futures[future]] = future.result()
+        for future in not_done:
+            future.cancel()
+        if not_done:
+            logger.warning("Task detection deadline hit after %.1fs: %d of %d messages unfinished",
+                           time.monotonic() - started, len(not_done), len(messages))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def detect_task_stream(message: str):
+    """Like detect_task, but yields the task text as Ollama generates it."""
+    payload = build_payload(message, stream=True)
+
+    try:
+        with timed("teamsync_llm_request", op="detect_stream"), \
+                get_session().post(OLLAMA_API_URL, json=payload, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            # Ollama streams one JSON object per line
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response", "").replace("\n", " ")
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    _record_eval(chunk)
+                    break
+
+    except requests.exceptions.RequestException as e:
+        logger.error("Error communicating with Ollama API: %s. "
+                     "Please ensure the Ollama server is running and the model is pulled.", e)
+        yield ERROR_RESULT
 
 
 if __name__ == "__main__":
     # Ensure you have 'requests' installed: pip install requests
+    # Run from backend/: python -m utils.task_identifier_model
 
     test_messages = [
         "Connect with Alex on Zoom tomorrow at 3 PM.",
@@ -105,8 +233,9 @@ if __name__ == "__main__":
         "Share the project files on mail."
     ]
 
-    for msg in test_messages:
-        result = detect_task(msg)
+    for msg, result in zip(test_messages, detect_tasks(test_messages)):
         print(f"Message: {msg}")
         print("Detected Task:", result)
-        print("-" * 50)
\ No newline at end of file
+        print("-" * 50)
+
+    print("Prompt eval:", get_prompt_eval_stats())
\ No newline at end of file
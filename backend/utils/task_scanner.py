@@ -0,0 +1,142 @@
+import argparse
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING, UpdateOne
+
+from .db_manager import messages_db
+from .task_identifier_model import detect_tasks, ERROR_RESULT, DEFAULT_CONCURRENCY
+from .intent_filter import gate_messages, get_gate_stats, load_intent_model, model_available
+from .metrics import timed, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+# A message the LLM keeps failing on is retried with exponential backoff,
+# then given up on, instead of heading every batch forever
+MAX_TASK_ATTEMPTS = int(os.getenv("TASK_DETECTION_MAX_ATTEMPTS", "5"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("TASK_DETECTION_RETRY_BACKOFF", "30"))
+
+
+def mark_untracked_messages_pending():
+    """Queue messages stored before task detection existed."""
+    return messages_db.update_many(
+        {"task_status": {"$exists": False}},
+        {"$set": {"task_status": "pending"}},
+    ).modified_count
+
+
+def process_pending_messages(batch_size: int = 32, max_workers: int = DEFAULT_CONCURRENCY, deadline: float = None,
+                             prefilter: bool = True, gate_threshold: float = None):
+    """Run task detection on the oldest batch of pending messages and store the results.
+
+    With `prefilter`, the intent classifier scores the batch first and only
+    messages it considers events/reminders go to the LLM; the rest are
+    stored with an empty task and `task_gate: "skipped"`.
+
+    A message that gets ERROR_RESULT is retried after RETRY_BACKOFF_SECONDS,
+    doubling each time, and marked `task_status: "failed"` after
+    MAX_TASK_ATTEMPTS.
+
+    Intended to run as a single scanner process; two scanners would pick up
+    the same batch.
+    """
+    now = datetime.utcnow()
+    docs = list(
+        messages_db.find(
+            {"task_status": "pending", "$or": [{"task_retry_at": {"$exists": False}}, {"task_retry_at": {"$lte": now}}]},
+            {"content": 1, "task_attempts": 1},
+        )
+        .sort("ts", ASCENDING)
+        .limit(batch_size)
+    )
+    if not docs:
+        return 0
+
+    updates = []
+    if prefilter:
+        passed = gate_messages([doc.get("content", "") for doc in docs], gate_threshold)
+        for doc in [doc for doc, keep in zip(docs, passed) if not keep]:
+            updates.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"task": "", "task_status": "done", "task_gate": "skipped", "task_detected_at": now}},
+            ))
+        docs = [doc for doc, keep in zip(docs, passed) if keep]
+
+    retried = 0
+    results = detect_tasks([doc.get("content", "") for doc in docs], max_workers=max_workers, deadline=deadline)
+    for doc, task in zip(docs, results):
+        if task == ERROR_RESULT:
+            attempts = doc.get("task_attempts", 0) + 1
+            if attempts >= MAX_TASK_ATTEMPTS:
+                updates.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"task_status": "failed", "task_attempts": attempts, "task_detected_at": now}},
+                ))
+            else:
+                # Left pending, but out of the next batches until the backoff passes
+                retried += 1
+                retry_at = now + timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+                updates.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"task_attempts": attempts, "task_retry_at": retry_at}},
+                ))
+            continue
+        updates.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"task": task, "task_status": "done", "task_detected_at": now}},
+        ))
+    if updates:
+        messages_db.bulk_write(updates, ordered=False)
+    # Deferred retries do not count, so a batch that only failed lets run_forever sleep
+    return len(updates) - retried
+
+
+def run_forever(batch_size: int = 32, max_workers: int = DEFAULT_CONCURRENCY, poll_interval: float = 5.0, deadline: float = None,
+                prefilter: bool = True, gate_threshold: float = None):
+    """Keep draining pending messages; sleep only when there is nothing to do.
+
+    Without a trained intent model the pre-filter is turned off with a
+    warning; a model whose labels do not match INTENT_TASK_LABELS stops the
+    scanner here rather than marking every message as skipped.
+    """
+    if prefilter:
+        if model_available():
+            load_intent_model()
+        else:
+            logger.warning("No intent model found; task pre-filter disabled, every message goes to the LLM")
+            prefilter = False
+    messages_db.create_index(
+        [("ts", ASCENDING)],
+        name="pending_tasks_by_ts",
+        partialFilterExpression={"task_status": "pending"},
+    )
+    print(f"Queued {mark_untracked_messages_pending()} older messages for task detection")
+    start_metrics_server()
+    while True:
+        started = time.monotonic()
+        with timed("teamsync_task_scan_batch"):
+            processed = process_pending_messages(batch_size, max_workers, deadline, prefilter, gate_threshold)
+        if processed:
+            rate = processed / (time.monotonic() - started)
+            print(f"Detected tasks for {processed} messages ({rate:.1f} msg/s)")
+            if prefilter:
+                print(f"Pre-filter: {get_gate_stats()}")
+        else:
+            time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m utils.task_scanner --batch-size 64 --workers 8
+    parser = argparse.ArgumentParser(description="Extract tasks from new chat messages in batches.")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--deadline", type=float, default=None, help="Seconds allowed per batch.")
+    parser.add_argument("--no-prefilter", action="store_true", help="Send every message to the LLM.")
+    parser.add_argument("--gate-threshold", type=float, default=None,
+                        help="Minimum event/reminder probability to reach the LLM (default INTENT_GATE_THRESHOLD).")
+    args = parser.parse_args()
+    run_forever(args.batch_size, args.workers, args.poll_interval, args.deadline,
+                not args.no_prefilter, args.gate_threshold)
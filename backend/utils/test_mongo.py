@@ -1,23 +1,13 @@
+import logging
 from bson import ObjectId
-from pymongo import MongoClient
-from utils.creds import URL
-import certifi
+from utils.mongo_client import get_database, ping
+
+logger = logging.getLogger(__name__)
 
-mongo_uri = URL
-database_name = "TEAMSYNC"
 collection_users = "USERS"
 collection_messages = "MESSAGES"
-try:
-    client = MongoClient(mongo_uri,
-       tls=True,
-    tlsCAFile=certifi.where()
-    )
-    client.admin.command("ping")
-    print("✅ Connected to MongoDB")
-except Exception as e:
-    print(f"❌ MongoDB connection failed: {e}")
-
-main_db = client[database_name]
+
+main_db = get_database()
 users_db = main_db[collection_users]
 messages_db = main_db[collection_messages]
 
@@ -27,7 +17,7 @@ def add_user(user_data: dict):
         result = users_db.insert_one(user_data)
         print(f"✅ User added with ID: {result.inserted_id}")
     except Exception as e:
-        print(f"❌ Error adding user: {e}")
+        logger.error("Error adding user: %s", e)
 
 
 def get_user_by_id(user_id: str):
@@ -36,7 +26,7 @@ def get_user_by_id(user_id: str):
         user = users_db.find_one({"_id": ObjectId(user_id)})
         return user
     except Exception as e:
-        print(f"❌ Error fetching user: {e}")
+        logger.error("Error fetching user: %s", e)
 
 
 def get_all_users():
@@ -52,7 +42,7 @@ def update_user(user_id: str, update_data: dict):
         )
         print(f"✅ {result.modified_count} user(s) updated")
     except Exception as e:
-        print(f"❌ Error updating user: {e}")
+        logger.error("Error updating user: %s", e)
 
 
 def delete_user(user_id: str):
@@ -61,7 +51,7 @@ def delete_user(user_id: str):
         result = users_db.delete_one({"_id": ObjectId(user_id)})
         print(f"🗑️ {result.deleted_count} user(s) deleted")
     except Exception as e:
-        print(f"❌ Error deleting user: {e}")
+        logger.error("Error deleting user: %s", e)
 
 
 # -----------------------------
@@ -73,7 +63,7 @@ def add_message(message_data: dict):
         result = messages_db.insert_one(message_data)
         print(f"💬 Message added with ID: {result.inserted_id}")
     except Exception as e:
-        print(f"❌ Error adding message: {e}")
+        logger.error("Error adding message: %s", e)
 
 
 def get_messages_for_user(user_id: str):
@@ -82,7 +72,7 @@ def get_messages_for_user(user_id: str):
         messages = list(messages_db.find({"sender_id": user_id}))
         return messages
     except Exception as e:
-        print(f"❌ Error fetching messages: {e}")
+        logger.error("Error fetching messages: %s", e)
 
 
 def delete_message(message_id: str):
@@ -91,13 +81,16 @@ def delete_message(message_id: str):
         result = messages_db.delete_one({"_id": ObjectId(message_id)})
         print(f"🗑️ {result.deleted_count} message(s) deleted")
     except Exception as e:
-        print(f"❌ Error deleting message: {e}")
+        logger.error("Error deleting message: %s", e)
 
 
 # -----------------------------
 # DEMO USAGE
 # -----------------------------
 if __name__ == "__main__":
+    if ping():
+        print("✅ Connected to MongoDB")
+
     # Add sample user
     add_user({"name": "Alice", "email": "alice@example.com"})
 
@@ -1,25 +1,88 @@
 from langchain.prompts import ChatPromptTemplate
 from langchain_ollama import ChatOllama
+from functools import lru_cache
+import os
+from .translation_cache import TranslationCache, DEFAULT_CACHE_PATH, normalize_text
+from .metrics import timed, register_collector
 
 model = ChatOllama(model="gemma2:2b-instruct-q5_0")
+translation_cache = TranslationCache(os.getenv("TRANSLATION_CACHE_PATH", DEFAULT_CACHE_PATH))
+register_collector("translation_cache", translation_cache.stats)
 
-def translate_text(text: str, source_lang: str, target_lang: str) -> str:
-
+@lru_cache(maxsize=64)
+def get_translation_chain(source_lang: str, target_lang: str):
+    """Build the prompt | model chain once per language pair."""
     prompt = ChatPromptTemplate.from_messages([
         ("system", f"You are a professional translator. Translate {source_lang} text into {target_lang}. "
                    f"Always reply with only the {target_lang} translation, nothing else."),
-        
+
         ("user", "The project is completed. Please review the attached report."),
         ("assistant", "El proyecto está completado. Por favor revise el informe adjunto."),
-        
+
         ("user", "I will send you the updated proposal by tomorrow morning."),
         ("assistant", "Le enviaré la propuesta actualizada mañana por la mañana."),
-        
+
         ("user", "{text}")
     ])
-    
-    chain = prompt | model
-    response = chain.invoke({"text": text})
+
+    return prompt | model
+
+def translate_text(text: str, source_lang: str, target_lang: str) -> str:
+    cached = translation_cache.get(text, source_lang, target_lang)
+    if cached is not None:
+        return cached
+
+    chain = get_translation_chain(source_lang, target_lang)
+    with timed("teamsync_llm_request", op="translate"):
+        response = chain.invoke({"text": text})
+    translation_cache.put(text, source_lang, target_lang, response.content)
     return response.content
 
-# print(translate_text("Can you help me with the translation?", "English", "Spanish"))
\ No newline at end of file
+def translate_text_stream(text: str, source_lang: str, target_lang: str):
+    """Yield the translation token by token; a cached translation comes in one piece."""
+    cached = translation_cache.get(text, source_lang, target_lang)
+    if cached is not None:
+        yield cached
+        return
+
+    chain = get_translation_chain(source_lang, target_lang)
+    parts = []
+    with timed("teamsync_llm_request", op="translate_stream"):
+        for chunk in chain.stream({"text": text}):
+            parts.append(chunk.content)
+            yield chunk.content
+    translation_cache.put(text, source_lang, target_lang, "".join(parts))
+
+def translate_batch(texts: list, source_lang: str, target_lang: str, max_concurrency: int = 4) -> list:
+    """Translate many texts for one language pair; results line up with `texts`.
+
+    Duplicates (after whitespace normalization) and cache hits are resolved
+    without the LLM, and the remaining texts go through `chain.batch` with at
+    most `max_concurrency` requests in flight.
+    """
+    results = {}
+    pending = []
+    for text in texts:
+        key = normalize_text(text)
+        if key in results:
+            continue
+        cached = translation_cache.get(text, source_lang, target_lang)
+        results[key] = cached
+        if cached is None:
+            pending.append(key)
+
+    if pending:
+        chain = get_translation_chain(source_lang, target_lang)
+        with timed("teamsync_llm_request", op="translate_batch"):
+            responses = chain.batch(
+                [{"text": text} for text in pending],
+                config={"max_concurrency": max_concurrency},
+            )
+        for text, response in zip(pending, responses):
+            translation_cache.put(text, source_lang, target_lang, response.content)
+            results[text] = response.content
+
+    return [results[normalize_text(text)] for text in texts]
+
+# print(translate_text("Can you help me with the translation?", "English", "Spanish"))
+# print(translate_batch(["ok", "thanks", "ok"], "English", "Spanish"))
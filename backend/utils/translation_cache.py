@@ -0,0 +1,120 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_cache.db")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different copies share an entry."""
+    return " ".join(str(text).split())
+
+
+def cache_key(text: str, source_lang: str, target_lang: str) -> str:
+    raw = f"{normalize_text(text)}\0{source_lang.strip().lower()}\0{target_lang.strip().lower()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """Two-tier translation memory: an in-process LRU in front of a SQLite file.
+
+    Lookups try the LRU first, then SQLite (promoting the row into the LRU),
+    and only a miss in both costs an LLM call. Both tiers are bounded; the
+    SQLite tier evicts the least recently used rows when it grows past
+    `max_disk_entries`.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_memory_entries: int = 5000, max_disk_entries: int = 200_000):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " translated TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+        self._conn.commit()
+        self._disk_rows = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def get(self, text: str, source_lang: str, target_lang: str):
+        """Return the cached translation, or None on a miss."""
+        key = cache_key(text, source_lang, target_lang)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            row = self._conn.execute("SELECT translated FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._conn.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, text: str, source_lang: str, target_lang: str, translated: str):
+        key = cache_key(text, source_lang, target_lang)
+        with self._lock:
+            self._remember(key, translated)
+            now = time.time()
+            # Update first so re-putting a key does not count as a new row
+            cursor = self._conn.execute(
+                "UPDATE translations SET translated = ?, last_used = ? WHERE key = ?", (translated, now, key),
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO translations (key, translated, last_used) VALUES (?, ?, ?)", (key, translated, now),
+                )
+                self._disk_rows += 1
+            if self._disk_rows > self.max_disk_entries:
+                self._evict_disk()
+            self._conn.commit()
+
+    def _remember(self, key, translated):
+        self._memory[key] = translated
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def _evict_disk(self):
+        # Trim 10% below the cap so eviction doesn't run on every insert.
+        self._disk_rows = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        excess = self._disk_rows - int(self.max_disk_entries * 0.9)
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._disk_rows -= excess
+            self.disk_evictions += excess
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "disk_entries": self._disk_rows,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+        }
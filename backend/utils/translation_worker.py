@@ -0,0 +1,198 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationWorkerPool:
+    """Background threads that translate stored messages and write the result back.
+
+    A message is stored with `translation_status: "pending"` and the target
+    languages in `pending_languages`, and each language is submitted as its
+    own job. A worker writes `translations.<language>` and pulls the language
+    from `pending_languages`; whichever job empties the list marks the message
+    "done" (or "failed" if no language succeeded). Languages of one message
+    therefore translate in parallel, and the number of workers bounds how
+    many requests are in flight against Ollama at once.
+
+    Before calling the LLM a worker claims the language on the message
+    (`translation_claims.<language>`, a lease expiring after `lease_seconds`),
+    so a job submitted by several processes is translated once; an expired
+    lease lets a later requeue (see start_requeue_loop) pick up the work of a
+    process that died.
+    """
+
+    def __init__(self, collection, translate_fn, workers: int = 2, max_retries: int = 3, backoff_seconds: float = 1.0,
+                 lease_seconds: float = 300.0):
+        self.collection = collection
+        self.translate_fn = translate_fn
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.lease_seconds = lease_seconds
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.skipped = 0
+        self.errors = 0
+        self._requeue_thread = None
+        self._threads = [
+            threading.Thread(target=self._run, name=f"translation-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, doc_id, text: str, source_lang: str, target_lang: str):
+        """Queue translation of the message with Mongo `_id` `doc_id` into `target_lang`."""
+        self._queue.put((doc_id, text, source_lang, target_lang))
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def requeue_pending(self, get_language, min_age_seconds: float = 0):
+        """Re-submit pending languages that nobody holds a live lease on.
+
+        With `min_age_seconds`, messages updated more recently than that are
+        left alone, since their jobs are most likely still queued somewhere.
+        """
+        now = datetime.utcnow()
+        query = {"translation_status": "pending"}
+        if min_age_seconds:
+            query["updated_at"] = {"$lt": now - timedelta(seconds=min_age_seconds)}
+        count = 0
+        for doc in self.collection.find(
+            query,
+            {"content": 1, "sender_user_id": 1, "receiver_user_id": 1, "pending_languages": 1, "translation_claims": 1},
+        ):
+            source_lang = get_language(doc["sender_user_id"])
+            # Messages queued before pending_languages existed target their receiver
+            targets = doc.get("pending_languages")
+            if targets is None:
+                targets = [get_language(doc.get("receiver_user_id"))]
+            claims = doc.get("translation_claims") or {}
+            for target_lang in targets:
+                if claims.get(target_lang) and claims[target_lang] >= now:
+                    continue
+                self.submit(doc["_id"], doc["content"], source_lang, target_lang)
+                count += 1
+        return count
+
+    def start_requeue_loop(self, get_language, interval_seconds: float):
+        """Every `interval_seconds`, requeue jobs whose lease expired or that were never claimed."""
+        def loop():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    requeued = self.requeue_pending(get_language, min_age_seconds=interval_seconds)
+                    if requeued:
+                        logger.info("Requeued %d stalled translations", requeued)
+                except Exception as e:
+                    logger.error("Translation requeue failed: %s", e)
+
+        if self._requeue_thread is None:
+            self._requeue_thread = threading.Thread(target=loop, name="translation-requeue", daemon=True)
+            self._requeue_thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self.in_flight += 1
+            try:
+                self._translate(*job)
+            except Exception as e:
+                # e.g. Mongo unreachable while claiming; the lease expires and a requeue retries it
+                with self._lock:
+                    self.errors += 1
+                logger.error("Translation job for message %s (%s) failed: %s", job[0], job[3], e)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                self._queue.task_done()
+
+    def _claim(self, doc_id, target_lang) -> bool:
+        """Take the lease on one pending language; False if it is done or leased elsewhere."""
+        now = datetime.utcnow()
+        claim = f"translation_claims.{target_lang}"
+        return self.collection.find_one_and_update(
+            {
+                "_id": doc_id,
+                "$and": [
+                    # Messages from before pending_languages existed have no list to check
+                    {"$or": [{"pending_languages": target_lang}, {"pending_languages": {"$exists": False}}]},
+                    {"$or": [{claim: {"$exists": False}}, {claim: {"$lt": now}}]},
+                ],
+            },
+            {"$set": {claim: now + timedelta(seconds=self.lease_seconds)}},
+            projection={"_id": 1},
+        ) is not None
+
+    def _translate(self, doc_id, text, source_lang, target_lang):
+        if not self._claim(doc_id, target_lang):
+            with self._lock:
+                self.skipped += 1
+            return
+        for attempt in range(self.max_retries + 1):
+            try:
+                translated = self.translate_fn(text, source_lang, target_lang)
+                self._finish(doc_id, target_lang, {f"translations.{target_lang}": str(translated).strip()})
+                with self._lock:
+                    self.completed += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error("Translation to %s failed for message %s: %s", target_lang, doc_id, e)
+                    break
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self.backoff_seconds * (2 ** attempt))
+
+        with self._lock:
+            self.failed += 1
+        try:
+            self._finish(doc_id, target_lang, {}, failed=True)
+        except Exception as e:
+            logger.error("Could not mark message %s as failed: %s", doc_id, e)
+
+    def _finish(self, doc_id, target_lang, fields, failed: bool = False):
+        """Record one language's outcome; the job that empties pending_languages settles the status."""
+        update = {
+            "$set": {**fields, "updated_at": datetime.utcnow()},
+            "$pull": {"pending_languages": target_lang},
+            "$unset": {f"translation_claims.{target_lang}": ""},
+        }
+        if failed:
+            update["$addToSet"] = {"failed_languages": target_lang}
+        doc = self.collection.find_one_and_update(
+            {"_id": doc_id},
+            update,
+            projection={"pending_languages": 1, "translations": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is not None and not doc.get("pending_languages"):
+            self.collection.update_one(
+                {"_id": doc_id, "translation_status": "pending"},
+                {"$set": {
+                    "translation_status": "done" if doc.get("translations") else "failed",
+                    "updated_at": datetime.utcnow(),
+                }},
+            )
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth(),
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "skipped": self.skipped,
+            "errors": self.errors,
+        }
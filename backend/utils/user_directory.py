@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Credentials never need to sit in the in-memory copy
+PRIVATE_FIELDS = {"password": 0, "password_hash": 0}
+
+
+class UserDirectory:
+    """In-process copy of the USERS collection, indexed by user_id and username.
+
+    The whole collection is loaded once and every lookup after that is a dict
+    access. The copy is kept fresh by a MongoDB change stream when the server
+    supports it (Atlas does), otherwise it is reloaded once `ttl_seconds` have
+    passed since the last full load.
+    """
+
+    def __init__(self, collection, ttl_seconds: int = 300, watch: bool = True):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._by_name = {}
+        self._oid_to_uid = {}
+        self._loaded_at = 0.0
+        self._watching = False
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.change_events = 0
+        if watch:
+            self._start_watcher()
+
+    # --------------------------------------
+    # Index maintenance
+    # --------------------------------------
+    def _index(self, doc):
+        uid = doc.get("user_id")
+        if uid is None:
+            return
+        old = self._by_id.get(uid)
+        if old is not None and old.get("username") != doc.get("username"):
+            self._by_name.pop(old.get("username"), None)
+        self._by_id[uid] = doc
+        if doc.get("username") is not None:
+            self._by_name[doc["username"]] = doc
+        if doc.get("_id") is not None:
+            self._oid_to_uid[doc["_id"]] = uid
+
+    def _unindex(self, object_id):
+        uid = self._oid_to_uid.pop(object_id, None)
+        doc = self._by_id.pop(uid, None)
+        if doc is not None:
+            self._by_name.pop(doc.get("username"), None)
+
+    def reload(self):
+        """Replace the indexes with a fresh full read of the collection."""
+        docs = list(self.collection.find({}, PRIVATE_FIELDS))
+        with self._lock:
+            self._by_id = {}
+            self._by_name = {}
+            self._oid_to_uid = {}
+            for doc in docs:
+                self._index(doc)
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def _ensure_fresh(self):
+        if self._watching and self._loaded_at:
+            return
+        if time.monotonic() - self._loaded_at >= self.ttl_seconds or not self._loaded_at:
+            self.reload()
+
+    # --------------------------------------
+    # Change stream
+    # --------------------------------------
+    def _start_watcher(self):
+        thread = threading.Thread(target=self._watch_loop, name="user-directory-watch", daemon=True)
+        thread.start()
+
+    def _watch_loop(self):
+        try:
+            with self.collection.watch(full_document="updateLookup") as stream:
+                self._watching = True
+                # Events that arrived before the stream opened are covered by
+                # reloading once the stream is live.
+                self.reload()
+                for change in stream:
+                    self._apply_change(change)
+        except Exception as e:
+            logger.warning("User directory change stream unavailable, using TTL refresh: %s", e)
+        finally:
+            self._watching = False
+
+    def _apply_change(self, change):
+        op = change.get("operationType")
+        with self._lock:
+            self.change_events += 1
+            if op in ("insert", "update", "replace") and change.get("fullDocument"):
+                doc = {k: v for k, v in change["fullDocument"].items() if k not in PRIVATE_FIELDS}
+                self._index(doc)
+            elif op == "delete":
+                self._unindex(change["documentKey"]["_id"])
+            elif op in ("drop", "rename", "invalidate"):
+                self._loaded_at = 0.0
+
+    # --------------------------------------
+    # Lookups
+    # --------------------------------------
+    def get(self, user_id):
+        """Return the user document for `user_id`, or None."""
+        self._ensure_fresh()
+        with self._lock:
+            doc = self._by_id.get(user_id)
+            if doc is not None:
+                self.hits += 1
+                return doc
+            self.misses += 1
+        doc = self.collection.find_one({"user_id": user_id}, PRIVATE_FIELDS)
+        if doc is not None:
+            with self._lock:
+                self._index(doc)
+        return doc
+
+    def get_by_name(self, username):
+        """Return the user document whose username is `username`, or None."""
+        self._ensure_fresh()
+        with self._lock:
+            doc = self._by_name.get(username)
+            if doc is not None:
+                self.hits += 1
+                return doc
+            self.misses += 1
+        doc = self.collection.find_one({"username": username}, PRIVATE_FIELDS)
+        if doc is not None:
+            with self._lock:
+                self._index(doc)
+        return doc
+
+    def all(self):
+        """Return every cached user document."""
+        self._ensure_fresh()
+        with self._lock:
+            self.hits += 1
+            return list(self._by_id.values())
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "users": len(self._by_id),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "reloads": self.reloads,
+            "change_events": self.change_events,
+            "watching": self._watching,
+        }
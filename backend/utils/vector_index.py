@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+
+from langchain_community.document_loaders import TextLoader, PyPDFLoader
+from langchain_community.vectorstores import Chroma
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCUMENTS_DIR = os.path.join(BACKEND_DIR, "documents")
+INDEX_DIR = os.getenv("RAG_INDEX_DIR", os.path.join(BACKEND_DIR, "vector_index"))
+MANIFEST_NAME = "manifest.json"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_name(path: str, documents_dir: str = DOCUMENTS_DIR) -> str:
+    """Key a file by its path under documents_dir, so same-named files in subfolders stay apart."""
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(documents_dir))
+    if relative.startswith(os.pardir):
+        return os.path.basename(path)
+    return relative.replace(os.sep, "/")
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Content-addressed chunk id: the same text from the same file keeps its id."""
+    return hashlib.sha256(f"{source}\0{text}".encode("utf-8")).hexdigest()
+
+
+def load_documents(path: str):
+    if path.lower().endswith(".pdf"):
+        return PyPDFLoader(path).load()
+    return TextLoader(path).load()
+
+
+def open_index(embedding_model, collection_name: str, persist_dir: str = INDEX_DIR):
+    """Open (or create) the on-disk Chroma collection without embedding anything."""
+    os.makedirs(persist_dir, exist_ok=True)
+    return Chroma(
+        collection_name=collection_name,
+        embedding_function=embedding_model,
+        persist_directory=persist_dir,
+    )
+
+
+def _manifest_path(persist_dir, collection_name):
+    return os.path.join(persist_dir, f"{collection_name}.{MANIFEST_NAME}")
+
+
+def _load_manifest(persist_dir, collection_name):
+    path = _manifest_path(persist_dir, collection_name)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(persist_dir, collection_name, manifest):
+    with open(_manifest_path(persist_dir, collection_name), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def ingest(vector_store, collection_name: str, paths, chunk_size: int = 1000, chunk_overlap: int = 200, persist_dir: str = INDEX_DIR, prune: bool = False,
+           documents_dir: str = DOCUMENTS_DIR):
+    """Bring the index in line with `paths`, embedding only chunks it has not seen.
+
+    Files whose hash matches the manifest are skipped without being read.
+    A changed file is re-split; chunks whose content hash is already stored
+    are kept, new ones are embedded, and ones that no longer exist are
+    deleted. With `prune`, documents indexed earlier but missing from
+    `paths` are removed as well. Documents are keyed by source_name().
+    """
+    manifest = _load_manifest(persist_dir, collection_name)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    stats = {"files_skipped": 0, "files_indexed": 0, "files_removed": 0, "chunks_added": 0, "chunks_removed": 0, "chunks_kept": 0}
+
+    for path in paths:
+        source = source_name(path, documents_dir)
+        file_hash = file_sha256(path)
+        if manifest.get(source) == file_hash:
+            stats["files_skipped"] += 1
+            continue
+
+        splits = splitter.split_documents(load_documents(path))
+        wanted = {}
+        for doc in splits:
+            doc.metadata["source"] = source
+            wanted.setdefault(chunk_id(source, doc.page_content), doc)
+
+        existing = set(vector_store.get(where={"source": source}, include=[])["ids"])
+        new_ids = [cid for cid in wanted if cid not in existing]
+        stale_ids = [cid for cid in existing if cid not in wanted]
+
+        if new_ids:
+            vector_store.add_documents([wanted[cid] for cid in new_ids], ids=new_ids)
+        if stale_ids:
+            vector_store.delete(ids=stale_ids)
+
+        manifest[source] = file_hash
+        _save_manifest(persist_dir, collection_name, manifest)
+        stats["files_indexed"] += 1
+        stats["chunks_added"] += len(new_ids)
+        stats["chunks_removed"] += len(stale_ids)
+        stats["chunks_kept"] += len(wanted) - len(new_ids)
+
+    if prune:
+        current = {source_name(path, documents_dir) for path in paths}
+        for source in [name for name in manifest if name not in current]:
+            stale_ids = vector_store.get(where={"source": source}, include=[])["ids"]
+            if stale_ids:
+                vector_store.delete(ids=stale_ids)
+            del manifest[source]
+            _save_manifest(persist_dir, collection_name, manifest)
+            stats["files_removed"] += 1
+            stats["chunks_removed"] += len(stale_ids)
+
+    return stats